@@ -3,8 +3,10 @@ Configuration module for the WebSocket Printer Client
 """
 
 import os
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from types import MappingProxyType
+from typing import Any, Dict, Optional, Type, TypeVar
 from enum import Enum
 
 # Load environment variables from .env file
@@ -16,6 +18,37 @@ except ImportError:
     DOTENV_AVAILABLE = False
 
 
+# Process-wide configurations handed out by instance(), keyed by class
+_instances: Dict[type, Any] = {}
+_instances_lock = threading.Lock()
+
+_ConfigT = TypeVar('_ConfigT', bound='_SharedInstance')
+
+
+class _SharedInstance:
+    """Mixin adding a lazily built, process-wide instance() to a config class"""
+    
+    @classmethod
+    def instance(cls: Type[_ConfigT]) -> _ConfigT:
+        """Return the process-wide configuration, built from the environment on first use
+        
+        The result is cached; call reload_env() to pick up environment changes.
+        from_env() always reads the current environment.
+        """
+        config = _instances.get(cls)
+        if config is None:
+            with _instances_lock:
+                config = _instances.get(cls)
+                if config is None:
+                    config = _instances[cls] = cls.from_env()
+        return config
+
+
+def reload_env():
+    """Drop the cached instance() configurations so the next call re-reads the environment"""
+    _instances.clear()
+
+
 class PrinterType(Enum):
     """Supported printer types"""
     LABEL = "label"
@@ -23,8 +56,12 @@ class PrinterType(Enum):
     LASER = "laser"
 
 
-@dataclass
-class PrinterConfig:
+# Value -> member map so from_env can resolve the printer type with one dict lookup
+_PRINTER_TYPE_BY_VALUE = {member.value: member for member in PrinterType}
+
+
+@dataclass(frozen=True)
+class PrinterConfig(_SharedInstance):
     """Printer configuration data class"""
     printer_id: str
     printer_name: str
@@ -37,10 +74,12 @@ class PrinterConfig:
     @classmethod
     def from_env(cls) -> 'PrinterConfig':
         """Create configuration from environment variables"""
+        printer_type = os.getenv('PRINTER_TYPE', 'thermal')
         return cls(
             printer_id=os.getenv('PRINTER_ID', 'PRINTER_001'),
             printer_name=os.getenv('PRINTER_NAME', 'Default Printer'),
-            printer_type=PrinterType(os.getenv('PRINTER_TYPE', 'thermal')),
+            # Unknown values fall through to PrinterType() so they still raise ValueError
+            printer_type=_PRINTER_TYPE_BY_VALUE.get(printer_type) or PrinterType(printer_type),
             location=os.getenv('PRINTER_LOCATION', 'Warehouse A'),
             serial_port=os.getenv('SERIAL_PORT', 'COM1'),
             baud_rate=int(os.getenv('BAUD_RATE', '9600')),
@@ -48,8 +87,8 @@ class PrinterConfig:
         )
 
 
-@dataclass
-class ServerConfig:
+@dataclass(frozen=True)
+class ServerConfig(_SharedInstance):
     """WebSocket server configuration"""
     url: str = "http://192.168.1.139:25625"
     reconnect_delay: float = 5.0
@@ -73,8 +112,8 @@ class ServerConfig:
         )
 
 
-@dataclass
-class AppConfig:
+@dataclass(frozen=True)
+class AppConfig(_SharedInstance):
     """Application configuration"""
     printer: PrinterConfig
     server: ServerConfig
@@ -93,7 +132,7 @@ class AppConfig:
 
 
 # Default configurations for different printer models
-PRINTER_PRESETS = {
+_RAW_PRESETS = {
     'zebra_zd410': {
         'baud_rate': 9600,
         'timeout': 2.0,
@@ -110,3 +149,17 @@ PRINTER_PRESETS = {
         'printer_type': PrinterType.LABEL
     }
 }
+
+# Presets are built once at import as shared, immutable PrinterConfig objects
+PRINTER_PRESETS = MappingProxyType({
+    name: PrinterConfig(
+        printer_id=name.upper(),
+        printer_name=name,
+        printer_type=preset['printer_type'],
+        location='',
+        serial_port='',
+        baud_rate=preset['baud_rate'],
+        timeout=preset['timeout']
+    )
+    for name, preset in _RAW_PRESETS.items()
+})
@@ -11,6 +11,36 @@ from printer_client import SerialPrinterInterface
 from label_generators import get_label_generator
 from config import PrinterConfig, PrinterType
 
+# Use orjson for faster JSON serialization when available
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _to_json(obj) -> str:
+    """Serialize a message as indented JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(obj, indent=2)
+
+
+# Registration message is static, so it is serialized once at import
+_REGISTRATION_MESSAGE = {
+    'printerId': 'PRINTER_001',
+    'printerName': 'Main Warehouse Printer',
+    'printerType': 'thermal',
+    'location': 'Warehouse A - Loading Dock'
+}
+_REGISTRATION_JSON = _to_json(_REGISTRATION_MESSAGE)
+
+# Translation table that shows non-printable control bytes as [XX] in previews
+_PREVIEW_TABLE = {
+    i: f'[{i:02X}]' for i in range(256)
+    if not (chr(i).isprintable() or chr(i) in '\n\r')
+}
+
 
 class MockSerialPrinter:
     """Mock serial printer for demonstration"""
@@ -40,16 +70,28 @@ class MockSerialPrinter:
         
         print(f"[MOCK] Sending command to printer ({len(command)} chars)")
         print(f"[MOCK] Preview: {repr(command[:50])}...")
-        self.print_history.append({
-            'timestamp': time.time(),
-            'command': command,
-            'length': len(command)
-        })
+        self._record(command, len(command))
         return True
     
     def send_raw_bytes(self, data: bytes) -> bool:
         """Mock raw bytes sending"""
-        return self.send_command(data.decode('utf-8', errors='ignore'))
+        if not self.is_connected:
+            return False
+        
+        # Only the first 50 bytes are decoded for the preview
+        preview = bytes(data[:50]).decode('utf-8', errors='replace')
+        print(f"[MOCK] Sending raw bytes to printer ({len(data)} bytes)")
+        print(f"[MOCK] Preview: {preview!r}...")
+        self._record(data, len(data))
+        return True
+    
+    def _record(self, payload, length: int):
+        """Store a sent payload in the print history"""
+        self.print_history.append({
+            'timestamp': time.time(),
+            'command': payload,
+            'length': length
+        })
 
 
 def demo_label_generation():
@@ -57,6 +99,8 @@ def demo_label_generation():
     print("🏷️  Label Generation Demo")
     print("=" * 50)
     
+    now_local = time.strftime('%Y-%m-%d %H:%M:%S')
+    
     # Get ESC/POS generator
     generator = get_label_generator("thermal")
     
@@ -76,7 +120,7 @@ def demo_label_generation():
         'maxWeight': 1000,
         'maxVolume': 500,
         'createdAt': '2025-08-07T10:30:00.000Z',
-        'printedAt': time.strftime('%Y-%m-%d %H:%M:%S')
+        'printedAt': now_local
     }
     
     location_label = generator.generate_location_label(location_data)
@@ -84,7 +128,7 @@ def demo_label_generation():
     print("Label content preview:")
     print("-" * 30)
     # Show printable characters only
-    preview = ''.join(c if c.isprintable() or c in '\n\r' else f'[{ord(c):02X}]' for c in location_label)
+    preview = location_label.translate(_PREVIEW_TABLE)
     print(preview[:300] + "..." if len(preview) > 300 else preview)
     print("-" * 30)
     
@@ -103,7 +147,7 @@ def demo_label_generation():
         'warehouseCode': 'WH001',
         'locationId': None,
         'createdAt': '2025-08-07T10:30:00.000Z',
-        'printedAt': time.strftime('%Y-%m-%d %H:%M:%S')
+        'printedAt': now_local
     }
     
     pallet_label = generator.generate_pallet_label(pallet_data)
@@ -114,7 +158,7 @@ def demo_label_generation():
     test_data = {
         'type': 'test',
         'message': 'Demo Test Label',
-        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S')
+        'timestamp': now_local
     }
     
     test_label = generator.generate_test_label(test_data)
@@ -172,15 +216,11 @@ def demo_websocket_message_format():
     print("\n🌐 WebSocket Message Format Demo")
     print("=" * 50)
     
+    now_iso = time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+    
     # Registration message
     print("\n📝 Printer Registration Message:")
-    registration = {
-        'printerId': 'PRINTER_001',
-        'printerName': 'Main Warehouse Printer',
-        'printerType': 'thermal',
-        'location': 'Warehouse A - Loading Dock'
-    }
-    print(json.dumps(registration, indent=2))
+    print(_REGISTRATION_JSON)
     
     # Print job message
     print("\n📄 Print Job Message:")
@@ -195,19 +235,19 @@ def demo_websocket_message_format():
             'locationType': 'SHELF',
             'template': 'location_label'
         },
-        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.000Z'),
+        'timestamp': now_iso,
         'requestedBy': 'web_client_001'
     }
-    print(json.dumps(print_job, indent=2))
+    print(_to_json(print_job))
     
     # Print result message
     print("\n✅ Print Result Message:")
     print_result = {
         'success': True,
         'message': 'Label printed successfully',
-        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        'timestamp': now_iso
     }
-    print(json.dumps(print_result, indent=2))
+    print(_to_json(print_result))
 
 
 def demo_configuration():
@@ -12,12 +12,18 @@ Kullanım:
 
 import asyncio
 import json
+import os
 import time
 import logging
+import platform
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Any
 
 # Modülleri import et
-from usb_printer_client import WebSocketPrinterClient, USBPrinterConfig, PrinterType, PrintJob
+from label_generators import get_label_generator
 from pallet_summary_generator import get_pallet_summary_generator
 
 
@@ -28,6 +34,16 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# İşletim sistemi bir kez tespit edilir
+_SYSTEM = platform.system()
+
+# Demo çıktılarının kaydedileceği klasör
+OUTPUT_DIR = "demo_output"
+
+# Geçici dosya temizliği için tek bir arka plan iş parçacığı; görevler mutlak
+# bitiş zamanı taşır, böylece sıradaki beklemeler birbirine eklenmez
+_CLEANUP_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tmpclean')
+
 
 def create_sample_pallet_data() -> Dict[str, Any]:
     """Örnek palet verisi oluştur"""
@@ -95,11 +111,67 @@ def create_sample_pallet_data() -> Dict[str, Any]:
     }
 
 
+def _load_print_job():
+    """USB istemci modülünü ilk ihtiyaçta yükle
+    
+    usb_printer_client serial/USB yığınını içe aktardığı için modül
+    seviyesinde değil, yalnızca PrintJob gerektiğinde yüklenir.
+    """
+    from usb_printer_client import PrintJob
+    return PrintJob
+
+
+def _unlink_at(path: str, deadline: float):
+    """time.monotonic() deadline'a ulaşana kadar bekleyip geçici dosyayı sil"""
+    time.sleep(max(0.0, deadline - time.monotonic()))
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _open_for_print(html: str, system: str, fallback_path: Path) -> Path:
+    """HTML özeti bir kez diske yaz ve yazdırma için aç
+    
+    macOS'ta geçici dosya Safari'de açılır; diğer platformlarda (veya hata
+    durumunda) HTML demo için fallback_path konumuna kaydedilir.
+    """
+    try:
+        if system == "Darwin":  # macOS
+            # Geçici dosya oluştur (sadece yazdırma için)
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
+                temp_file.write(html)
+                temp_html_path = temp_file.name
+            
+            # HTML dosyasını Safari'de aç ve yazdır
+            cmd = ["open", "-a", "Safari", temp_html_path]
+            subprocess.run(cmd)
+            print("   📄 HTML özet Safari'de açıldı ve yazdırma için hazır")
+            print("   💡 Safari otomatik olarak yazdırma penceresini açacak!")
+            
+            # Geçici dosyayı temizle (Safari'nin dosyayı yüklemesi için bekledikten sonra)
+            _CLEANUP_POOL.submit(_unlink_at, temp_html_path, time.monotonic() + 10)
+            return Path(temp_html_path)
+        
+        print(f"   📄 Platform: {system} - Manuel yazdırma gerekli")
+        
+    except Exception as e:
+        print(f"   ⚠️  Yazdırma simülasyon hatası: {e}")
+    
+    # Demo için HTML'i dosyaya kaydet
+    fallback_path.write_bytes(html.encode('utf-8'))
+    print(f"   💾 Demo için HTML kaydedildi: {fallback_path}")
+    return fallback_path
+
+
 async def simulate_print_job():
     """Palet yazdırma işlemini simüle et"""
     print("🏷️  Palet Etiket ve Özet Yazdırma Demo")
     print("=" * 60)
     
+    # Yerel saat bir kez alınır; iş zaman damgası ve dosya adları bundan türetilir
+    now = time.localtime()
+    
     # Örnek palet verisi
     pallet_data = create_sample_pallet_data()
     
@@ -113,10 +185,11 @@ async def simulate_print_job():
     print()
     
     # PrintJob objesi oluştur
+    PrintJob = _load_print_job()
     job = PrintJob(
-        job_id=f"job_{int(time.time())}",
+        job_id=f"job_{time.time_ns()}",
         label_data=pallet_data,
-        timestamp=time.strftime('%Y-%m-%d %H:%M:%S'),
+        timestamp=time.strftime('%Y-%m-%d %H:%M:%S', now),
         requested_by="Demo Script"
     )
     
@@ -124,7 +197,6 @@ async def simulate_print_job():
     print("1. 🏷️  ZPL etiket oluşturuluyor...")
     
     # Label generator kullanarak ZPL oluştur
-    from label_generators import get_label_generator
     label_generator = get_label_generator("zpl")
     zpl_command = label_generator.generate_pallet_label(pallet_data)
     
@@ -132,16 +204,13 @@ async def simulate_print_job():
     print("   🖨️  ZPL komutu termal yazıcıya gönderilecek...")
     
     # ZPL komutunu dosyaya kaydet (gerçek yazıcı yok)
-    import os
-    output_dir = "demo_output"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    output_dir = OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
     
-    timestamp = time.strftime('%Y%m%d_%H%M%S')
+    timestamp = time.strftime('%Y%m%d_%H%M%S', now)
     zpl_file = f"{output_dir}/pallet_label_{pallet_data['palet_id']}_{timestamp}.zpl"
     
-    with open(zpl_file, 'w', encoding='utf-8') as f:
-        f.write(zpl_command)
+    Path(zpl_file).write_bytes(zpl_command.encode('utf-8'))
     
     print(f"   💾 ZPL dosyası kaydedildi: {zpl_file}")
     
@@ -162,73 +231,8 @@ async def simulate_print_job():
     print("   ✅ A5 HTML özet raporu oluşturuldu")
     print("   🖨️  Özet raporu direkt yazıcıya gönderiliyor (dosya kaydedilmiyor)...")
     
-    # Direkt yazdırma simülasyonu
-    try:
-        import subprocess
-        import platform
-        import tempfile
-        
-        system = platform.system()
-        if system == "Darwin":  # macOS
-            # Geçici dosya oluştur (sadece yazdırma için)
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.html', delete=False, encoding='utf-8') as temp_file:
-                temp_file.write(html_summary)
-                temp_html_path = temp_file.name
-            
-            # HTML dosyasını Safari'de aç ve yazdır
-            cmd = ["open", "-a", "Safari", temp_html_path]
-            subprocess.run(cmd)
-            print("   📄 HTML özet Safari'de açıldı ve yazdırma için hazır")
-            print("   💡 Safari otomatik olarak yazdırma penceresini açacak!")
-            
-            # Geçici dosyayı temizle (biraz bekledikten sonra)
-            import threading
-            import time
-            def cleanup():
-                time.sleep(10)  # Safari'nin dosyayı yüklemesi için bekle
-                try:
-                    import os
-                    os.unlink(temp_html_path)
-                except:
-                    pass
-            
-            threading.Thread(target=cleanup).start()
-            
-        else:
-            print(f"   📄 Platform: {system} - Manuel yazdırma gerekli")
-            # Demo için HTML'i dosyaya kaydet
-            html_file = f"{output_dir}/demo_summary_{timestamp}.html"
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(html_summary)
-            print(f"   💾 Demo için HTML kaydedildi: {html_file}")
-            
-    except Exception as e:
-        print(f"   ⚠️  Yazdırma simülasyon hatası: {e}")
-        # Hata durumunda demo için kaydet
-        html_file = f"{output_dir}/demo_summary_{timestamp}.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_summary)
-        print(f"   💾 Demo için HTML kaydedildi: {html_file}")
-    
-    print("3. 🖨️  Özet raporu varsayılan yazıcıya gönderiliyor...")
-    
-    # macOS'ta yazdırma simülasyonu
-    try:
-        import subprocess
-        import platform
-        
-        system = platform.system()
-        if system == "Darwin":  # macOS
-            # HTML dosyasını Safari'de aç
-            cmd = ["open", "-a", "Safari", html_file]
-            subprocess.run(cmd)
-            print("   📄 HTML özet Safari'de açıldı")
-            print("   💡 Şimdi Safari'de Cmd+P ile yazdırabilirsiniz!")
-        else:
-            print(f"   📄 Platform: {system} - Manual yazdırma gerekli")
-            
-    except Exception as e:
-        print(f"   ⚠️  Yazdırma hatası: {e}")
+    # Direkt yazdırma simülasyonu (HTML tek seferde yazılır ve açılır)
+    _open_for_print(html_summary, _SYSTEM, Path(output_dir) / f"demo_summary_{timestamp}.html")
     
     print()
     print("✅ Demo tamamlandı!")
@@ -10,12 +10,14 @@ Usage:
     python fix_com3.py
 """
 
+import functools
 import logging
 import platform
 import subprocess
 import sys
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 try:
     import serial
@@ -33,20 +35,107 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_IS_WINDOWS = platform.system().lower() == 'windows'
+
+# Port this tool diagnoses (already upper-cased to match _port_map() keys)
+_DEFAULT_PORT = 'COM3'
+
+# Manual fix instructions, logged as a single message
+_MANUAL_SOLUTIONS = """\
+============================================================
+🔧 MANUAL SOLUTIONS FOR COM3 ACCESS ISSUES
+============================================================
+1. CLOSE OTHER APPLICATIONS:
+   • Close Arduino IDE
+   • Close PuTTY, HyperTerminal, or other terminal programs
+   • Close ZebraLink, Zebra Setup Utilities
+   • Close any printer configuration software
+   • Close Windows Print Spooler (if safe to do so)
+
+2. WINDOWS DEVICE MANAGER:
+   • Press Win+X and select 'Device Manager'
+   • Expand 'Ports (COM & LPT)'
+   • Find your COM3 port
+   • Right-click → 'Disable device'
+   • Wait 5 seconds
+   • Right-click → 'Enable device'
+
+3. PHYSICAL RECONNECTION:
+   • Unplug the USB cable from the printer
+   • Wait 10 seconds
+   • Plug it back in
+   • Try a different USB port on your computer
+
+4. RESTART WINDOWS SERVICES:
+   • Press Win+R, type 'services.msc'
+   • Find 'Print Spooler' service
+   • Right-click → 'Restart'
+   • Find 'Plug and Play' service
+   • Right-click → 'Restart'
+
+5. USE ALTERNATIVE CONNECTION:
+   • Set environment variable: set CONNECTION_TYPE=usb
+   • Or try a different COM port if available
+
+6. LAST RESORT:
+   • Restart your computer
+   • This will release all port locks
+"""
+
+_NEXT_STEPS = """\
+🏁 NEXT STEPS:
+1. Try the manual solutions above
+2. If you have working alternative ports, use them
+3. Consider using USB direct connection instead
+4. If all else fails, restart your computer"""
+
+# Windows helper script, pre-encoded with the CRLF line endings cmd.exe expects
+_BATCH_CONTENT = '''@echo off
+echo Zebra Printer COM3 Fix Utility
+echo ===============================
+echo.
+
+echo Step 1: Stopping Print Spooler...
+net stop spooler
+timeout /t 2 /nobreak > nul
+
+echo Step 2: Starting Print Spooler...
+net start spooler
+timeout /t 2 /nobreak > nul
+
+echo Step 3: Refreshing USB devices...
+echo Please disconnect and reconnect your printer USB cable now.
+echo Then press any key to continue...
+pause > nul
+
+echo.
+echo Fix complete! Try running the WebSocket client again.
+echo.
+pause
+'''.replace('\n', '\r\n').encode('ascii')
+
+
+@functools.lru_cache(maxsize=1)
+def _port_map() -> Dict[str, Any]:
+    """Snapshot of the system's serial ports keyed by upper-cased device name
+    
+    Port enumeration is slow on Windows, so it is done once and reused.
+    Call _port_map.cache_clear() after anything that may change the ports.
+    """
+    return {p.device.upper(): p for p in serial.tools.list_ports.comports()}
+
 
 def check_if_port_exists(port: str) -> bool:
     """Check if the specified port exists in the system"""
-    ports = list(serial.tools.list_ports.comports())
-    return any(p.device.upper() == port.upper() for p in ports)
+    return port.upper() in _port_map()
 
 
 def get_port_description(port: str) -> str:
     """Get the description of a specific port"""
-    ports = list(serial.tools.list_ports.comports())
-    for p in ports:
-        if p.device.upper() == port.upper():
-            return p.description
-    return "Port not found"
+    port_info = _port_map().get(port.upper())
+    if port_info is None:
+        return "Port not found"
+    return port_info.description
 
 
 def quick_port_release(port: str) -> bool:
@@ -77,10 +166,9 @@ def quick_port_release(port: str) -> bool:
         
         # Final test
         time.sleep(1.0)
-        with serial.Serial(port, 9600, timeout=0.1) as ser:
-            if ser.is_open:
-                logger.info(f"✅ Successfully released {port}")
-                return True
+        if _is_port_accessible(port):
+            logger.info(f"✅ Successfully released {port}")
+            return True
                 
     except Exception as e:
         logger.debug(f"Release attempt failed: {e}")
@@ -89,106 +177,60 @@ def quick_port_release(port: str) -> bool:
     return False
 
 
+def _is_port_accessible(port: str) -> bool:
+    """Open the port briefly to check that it is free
+    
+    Only the open itself matters for this liveness probe, so the port is
+    configured on an unopened Serial object and opened once, without
+    passing a baud rate.
+    """
+    ser = serial.Serial()
+    ser.port = port
+    ser.timeout = 0.1
+    try:
+        ser.open()
+        return ser.is_open
+    finally:
+        ser.close()
+
+
 def find_alternative_ports() -> List[str]:
     """Find alternative working COM ports"""
     logger.info("Searching for alternative working ports...")
     
-    working_ports = []
-    ports = list(serial.tools.list_ports.comports())
+    ports = list(_port_map().values())
+    if not ports:
+        return []
     
-    for port in ports:
+    def probe(port) -> Optional[str]:
         try:
-            with serial.Serial(port.device, 9600, timeout=0.1) as ser:
-                if ser.is_open:
-                    working_ports.append(port.device)
-                    logger.info(f"✅ Found working port: {port.device} ({port.description})")
+            if _is_port_accessible(port.device):
+                logger.info(f"✅ Found working port: {port.device} ({port.description})")
+                return port.device
         except Exception:
             logger.debug(f"❌ Port {port.device} not accessible")
+        return None
+    
+    # Each probe mostly waits on the OS, so all ports are probed concurrently
+    with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+        results = executor.map(probe, ports)
     
-    return working_ports
+    return [device for device in results if device]
 
 
 def show_manual_solutions():
     """Show manual solutions for COM3 issues"""
-    logger.info("=" * 60)
-    logger.info("🔧 MANUAL SOLUTIONS FOR COM3 ACCESS ISSUES")
-    logger.info("=" * 60)
-    
-    logger.info("1. CLOSE OTHER APPLICATIONS:")
-    logger.info("   • Close Arduino IDE")
-    logger.info("   • Close PuTTY, HyperTerminal, or other terminal programs")
-    logger.info("   • Close ZebraLink, Zebra Setup Utilities")
-    logger.info("   • Close any printer configuration software")
-    logger.info("   • Close Windows Print Spooler (if safe to do so)")
-    logger.info("")
-    
-    logger.info("2. WINDOWS DEVICE MANAGER:")
-    logger.info("   • Press Win+X and select 'Device Manager'")
-    logger.info("   • Expand 'Ports (COM & LPT)'")
-    logger.info("   • Find your COM3 port")
-    logger.info("   • Right-click → 'Disable device'")
-    logger.info("   • Wait 5 seconds")
-    logger.info("   • Right-click → 'Enable device'")
-    logger.info("")
-    
-    logger.info("3. PHYSICAL RECONNECTION:")
-    logger.info("   • Unplug the USB cable from the printer")
-    logger.info("   • Wait 10 seconds")
-    logger.info("   • Plug it back in")
-    logger.info("   • Try a different USB port on your computer")
-    logger.info("")
-    
-    logger.info("4. RESTART WINDOWS SERVICES:")
-    logger.info("   • Press Win+R, type 'services.msc'")
-    logger.info("   • Find 'Print Spooler' service")
-    logger.info("   • Right-click → 'Restart'")
-    logger.info("   • Find 'Plug and Play' service")
-    logger.info("   • Right-click → 'Restart'")
-    logger.info("")
-    
-    logger.info("5. USE ALTERNATIVE CONNECTION:")
-    logger.info("   • Set environment variable: set CONNECTION_TYPE=usb")
-    logger.info("   • Or try a different COM port if available")
-    logger.info("")
-    
-    logger.info("6. LAST RESORT:")
-    logger.info("   • Restart your computer")
-    logger.info("   • This will release all port locks")
-    logger.info("")
+    logger.info(_MANUAL_SOLUTIONS)
 
 
 def create_fix_batch_file():
     """Create a batch file for Windows to help with port issues"""
-    if platform.system().lower() != 'windows':
+    if not _IS_WINDOWS:
         return
     
-    batch_content = '''@echo off
-echo Zebra Printer COM3 Fix Utility
-echo ===============================
-echo.
-
-echo Step 1: Stopping Print Spooler...
-net stop spooler
-timeout /t 2 /nobreak > nul
-
-echo Step 2: Starting Print Spooler...
-net start spooler
-timeout /t 2 /nobreak > nul
-
-echo Step 3: Refreshing USB devices...
-echo Please disconnect and reconnect your printer USB cable now.
-echo Then press any key to continue...
-pause > nul
-
-echo.
-echo Fix complete! Try running the WebSocket client again.
-echo.
-pause
-'''
-    
     try:
-        with open('fix_com3.bat', 'w') as f:
-            f.write(batch_content)
+        with open('fix_com3.bat', 'wb') as f:
+            f.write(_BATCH_CONTENT)
         logger.info("✅ Created 'fix_com3.bat' - Run as Administrator to fix COM3 issues")
     except Exception as e:
         logger.error(f"Failed to create batch file: {e}")
@@ -198,13 +240,14 @@ def main():
     logger.info("🔧 COM3 Port Issue Diagnostic and Fix Tool")
     logger.info("=" * 50)
     
-    # Check if COM3 exists
-    if not check_if_port_exists('COM3'):
+    # Check if COM3 exists (one lookup serves both the check and the description)
+    com3_info = _port_map().get(_DEFAULT_PORT)
+    if com3_info is None:
         logger.error("❌ COM3 port not found in system")
         logger.info("Your printer might be on a different port.")
         
         # Show all available ports
-        ports = list(serial.tools.list_ports.comports())
+        ports = list(_port_map().values())
         if ports:
             logger.info("\nAvailable ports:")
             for port in ports:
@@ -212,25 +255,26 @@ def main():
         return 1
     
     # Show COM3 details
-    description = get_port_description('COM3')
-    logger.info(f"📍 Found COM3: {description}")
+    logger.info(f"📍 Found COM3: {com3_info.description}")
     
     # Test if COM3 is accessible
     try:
-        with serial.Serial('COM3', 9600, timeout=0.1) as ser:
-            if ser.is_open:
-                logger.info("✅ COM3 is accessible! The issue might be temporary.")
-                logger.info("Try running the WebSocket client again.")
-                return 0
+        if _is_port_accessible(_DEFAULT_PORT):
+            logger.info("✅ COM3 is accessible! The issue might be temporary.")
+            logger.info("Try running the WebSocket client again.")
+            return 0
     except Exception as e:
         logger.warning(f"❌ COM3 is blocked: {e}")
     
     # Try quick fix
     logger.info("\n🛠️  Attempting automatic fix...")
-    if quick_port_release('COM3'):
+    if quick_port_release(_DEFAULT_PORT):
         logger.info("✅ COM3 has been released! Try running the client again.")
         return 0
     
+    # Port state may have changed during the release attempt
+    _port_map.cache_clear()
+    
     # Look for alternatives
     logger.info("\n🔍 Looking for alternative working ports...")
     alternatives = find_alternative_ports()
@@ -245,17 +289,13 @@ def main():
         logger.warning("\n❌ No alternative working ports found")
     
     # Create Windows batch file helper
-    if platform.system().lower() == 'windows':
+    if _IS_WINDOWS:
         create_fix_batch_file()
     
     # Show manual solutions
     show_manual_solutions()
     
-    logger.info("🏁 NEXT STEPS:")
-    logger.info("1. Try the manual solutions above")
-    logger.info("2. If you have working alternative ports, use them")
-    logger.info("3. Consider using USB direct connection instead")
-    logger.info("4. If all else fails, restart your computer")
+    logger.info(_NEXT_STEPS)
     
     return 1
 
@@ -1,20 +1,126 @@
 #!/usr/bin/env python3
 # filepath: fix_usb_busy.py
 
-import subprocess
+import errno
+import functools
 import usb.core
 import usb.util
 import os
+import signal
 import sys
 import time
-from typing import List, Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ZEBRA_VENDOR_ID = 0x0a5f
+
+@functools.lru_cache(maxsize=1)
+def _zebra_devices() -> Tuple[Any, ...]:
+    """Zebra USB cihazlarını bir kez listele
+    
+    Cihaz durumunu değiştiren işlemlerden (reset, detach) sonra
+    _zebra_devices.cache_clear() çağrılmalıdır.
+    """
+    return tuple(usb.core.find(find_all=True, idVendor=ZEBRA_VENDOR_ID))
+
+_SYSFS_USB_DEVICES = '/sys/bus/usb/devices'
+_ZEBRA_VENDOR_HEX = f"{ZEBRA_VENDOR_ID:04x}"
+
+def _read_sysfs_attr(device_path: str, name: str) -> Optional[str]:
+    """sysfs cihaz dizinindeki küçük bir öznitelik dosyasını oku"""
+    try:
+        with open(f"{device_path}/{name}") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _find_zebra_sysfs() -> Optional[List[Tuple[int, int, int, str]]]:
+    """Zebra cihazlarını libusb açmadan sysfs üzerinden bul
+    
+    (bus, address, product_id, sysfs_path) listesi döner. sysfs yoksa
+    (Linux dışı sistemler) None döner; çağıran libusb'ye düşmelidir.
+    """
+    try:
+        entries = os.scandir(_SYSFS_USB_DEVICES)
+    except OSError:
+        return None
+    
+    found = []
+    with entries:
+        for entry in entries:
+            # "1-1.2:1.0" gibi interface girdilerinde idVendor yok
+            if ':' in entry.name:
+                continue
+            if _read_sysfs_attr(entry.path, 'idVendor') != _ZEBRA_VENDOR_HEX:
+                continue
+            
+            try:
+                bus = int(_read_sysfs_attr(entry.path, 'busnum') or '')
+                address = int(_read_sysfs_attr(entry.path, 'devnum') or '')
+                product_id = int(_read_sysfs_attr(entry.path, 'idProduct') or '0', 16)
+            except ValueError:
+                continue
+            
+            found.append((bus, address, product_id, entry.path))
+    
+    return found
+
+def _read_process_name(pid_path: str) -> str:
+    """/proc/<pid>/comm dosyasından process adını oku"""
+    try:
+        with open(f"{pid_path}/comm") as f:
+            return f.read().strip()
+    except OSError:
+        return '?'
+
+def _find_path_users(usb_paths: List[str]) -> Tuple[Dict[str, List[Tuple[str, str]]], Optional[str]]:
+    """USB yollarını açık tutan process'leri /proc/*/fd taraması ile bul
+    
+    {yol: [(pid, process adı), ...]} sözlüğü döndürülür. Hata durumunda
+    ikinci değer kullanıcıya gösterilecek mesajdır.
+    """
+    wanted = set(usb_paths)
+    users_by_path: Dict[str, List[Tuple[str, str]]] = {}
+    
+    try:
+        proc_entries = os.scandir('/proc')
+    except OSError as e:
+        return {}, f"❌ /proc okunamadı: {e}"
+    
+    with proc_entries:
+        for pid_dir in proc_entries:
+            if not pid_dir.name.isdigit():
+                continue
+            
+            # Başka kullanıcıların fd'leri root olmadan okunamaz
+            try:
+                fd_entries = os.scandir(f"{pid_dir.path}/fd")
+            except OSError:
+                continue
+            
+            with fd_entries:
+                for fd in fd_entries:
+                    try:
+                        target = os.readlink(fd.path)
+                    except OSError:
+                        continue
+                    
+                    if target in wanted:
+                        user = (pid_dir.name, _read_process_name(pid_dir.path))
+                        users = users_by_path.setdefault(target, [])
+                        if user not in users:
+                            users.append(user)
+    
+    return users_by_path, None
 
 def find_usb_processes() -> List[Dict[str, Any]]:
     """Find processes using USB devices"""
     print("🔍 USB cihazını kullanan process'leri bulma...")
     
-    # Zebra yazıcıları bul
-    zebra_devices = list(usb.core.find(find_all=True, idVendor=0x0a5f))
+    # Zebra yazıcıları bul (önce sysfs, yoksa libusb)
+    zebra_devices = _find_zebra_sysfs()
+    if zebra_devices is None:
+        zebra_devices = [(device.bus, device.address, device.idProduct, None)
+                         for device in _zebra_devices()]
     
     if not zebra_devices:
         print("❌ Zebra USB cihazı bulunamadı")
@@ -22,50 +128,63 @@ def find_usb_processes() -> List[Dict[str, Any]]:
     
     processes = []
     
-    for device in zebra_devices:
-        print(f"\n📱 Cihaz: Bus {device.bus:03d} Device {device.address:03d}")
-        print(f"   Vendor ID: 0x{device.idVendor:04x}")
-        print(f"   Product ID: 0x{device.idProduct:04x}")
+    # Tüm USB yolları için tek bir /proc taraması
+    usb_paths = [f"/dev/bus/usb/{bus:03d}/{address:03d}" for bus, address, _, _ in zebra_devices]
+    users_by_path, scan_error = _find_path_users(usb_paths)
+    
+    for (bus, address, product_id, _), usb_path in zip(zebra_devices, usb_paths):
+        print(f"\n📱 Cihaz: Bus {bus:03d} Device {address:03d}")
+        print(f"   Vendor ID: 0x{ZEBRA_VENDOR_ID:04x}")
+        print(f"   Product ID: 0x{product_id:04x}")
         
-        # lsof ile USB cihazını kullanan process'leri bul
-        usb_path = f"/dev/bus/usb/{device.bus:03d}/{device.address:03d}"
+        if scan_error:
+            print(f"   {scan_error}")
+            continue
         
-        try:
-            result = subprocess.run(
-                ['lsof', usb_path], 
-                capture_output=True, 
-                text=True, 
-                timeout=10
-            )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                print(f"   ⚠️ Cihaz kullanımda:")
-                lines = result.stdout.strip().split('\n')[1:]  # Header'ı atla
-                for line in lines:
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        process_name = parts[0]
-                        pid = parts[1]
-                        print(f"   📍 Process: {process_name} (PID: {pid})")
-                        processes.append({
-                            'name': process_name,
-                            'pid': pid,
-                            'device_path': usb_path,
-                            'bus': device.bus,
-                            'address': device.address
-                        })
-            else:
-                print("   ✅ Cihaz boş")
-                
-        except subprocess.TimeoutExpired:
-            print("   ⏰ lsof timeout")
-        except FileNotFoundError:
-            print("   ❌ lsof bulunamadı (sudo apt install lsof)")
-        except Exception as e:
-            print(f"   ❌ Hata: {e}")
+        users = users_by_path.get(usb_path)
+        if users:
+            print(f"   ⚠️ Cihaz kullanımda:")
+            for pid, process_name in users:
+                print(f"   📍 Process: {process_name} (PID: {pid})")
+                processes.append({
+                    'name': process_name,
+                    'pid': pid,
+                    'device_path': usb_path,
+                    'bus': bus,
+                    'address': address
+                })
+        else:
+            print("   ✅ Cihaz boş")
     
     return processes
 
+def _is_alive(pid: int) -> bool:
+    """Process hala çalışıyor mu kontrol et"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # Process var ama sinyal gönderme izni yok
+    return True
+
+def _send_signal(pid: int, sig: int):
+    """Process'e sinyal gönder
+    
+    Process kendi grubunun lideriyse (ör. worker'larını başlatan bir spooler)
+    sinyal tek bir killpg çağrısıyla tüm gruba gönderilir. Bu script'in kendi
+    grubu hiçbir zaman hedeflenmez.
+    """
+    try:
+        pgid = os.getpgid(pid)
+    except OSError:
+        pgid = None
+    
+    if pgid == pid and pgid != os.getpgrp():
+        os.killpg(pgid, sig)
+    else:
+        os.kill(pid, sig)
+
 def kill_usb_processes(processes: List[Dict[str, Any]]) -> bool:
     """Kill processes using USB devices"""
     if not processes:
@@ -75,26 +194,20 @@ def kill_usb_processes(processes: List[Dict[str, Any]]) -> bool:
     print(f"\n🔥 {len(processes)} process sonlandırılacak...")
     
     success = True
+    
+    # 1. Tüm process'lere önce SIGTERM gönder
+    pending: Dict[int, str] = {}
     for proc in processes:
         try:
             pid = int(proc['pid'])
             process_name = proc['name']
+            if pid in pending:
+                continue
             
             print(f"🔪 Sonlandırılıyor: {process_name} (PID: {pid})")
+            _send_signal(pid, signal.SIGTERM)
+            pending[pid] = process_name
             
-            # Önce SIGTERM gönder
-            os.kill(pid, 15)  # SIGTERM
-            time.sleep(1)
-            
-            # Process'in hala çalışıp çalışmadığını kontrol et
-            try:
-                os.kill(pid, 0)  # Process var mı kontrol et
-                print(f"   ⚠️ Process hala çalışıyor, SIGKILL gönderiliyor...")
-                os.kill(pid, 9)  # SIGKILL
-                time.sleep(0.5)
-            except ProcessLookupError:
-                print(f"   ✅ Process sonlandırıldı")
-                
         except ProcessLookupError:
             print(f"   ✅ Process zaten yok: {proc['name']}")
         except PermissionError:
@@ -104,68 +217,122 @@ def kill_usb_processes(processes: List[Dict[str, Any]]) -> bool:
             print(f"   ❌ Hata: {proc['name']} - {e}")
             success = False
     
+    # 2. Hepsinin kapanmasını tek bir 1 saniyelik pencerede bekle
+    deadline = time.monotonic() + 1.0
+    while pending and time.monotonic() < deadline:
+        for pid in [pid for pid in pending if not _is_alive(pid)]:
+            print(f"   ✅ Process sonlandırıldı: {pending.pop(pid)}")
+        if pending:
+            time.sleep(0.05)
+    
+    # 3. Hala çalışanlara SIGKILL gönder
+    for pid, process_name in pending.items():
+        print(f"   ⚠️ Process hala çalışıyor, SIGKILL gönderiliyor: {process_name}")
+        try:
+            _send_signal(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        except Exception as e:
+            print(f"   ❌ Hata: {process_name} - {e}")
+            success = False
+    if pending:
+        time.sleep(0.5)
+    
     return success
 
-def reset_usb_device(vendor_id: int = 0x0a5f) -> bool:
+def _is_busy_error(e: Exception) -> bool:
+    """EBUSY (Errno 16) hatası mı? errno doldurmayan backend'ler için mesaja bak"""
+    err = getattr(e, 'errno', None)
+    if err is not None:
+        return err == errno.EBUSY
+    return "busy" in str(e).lower()
+
+def _wait_for(predicate: Callable[[], bool], timeout: float, interval: float = 0.05) -> bool:
+    """predicate True dönene kadar (en fazla timeout saniye) kısa aralıklarla yokla"""
+    deadline = time.monotonic() + timeout
+    while True:
+        if predicate():
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+def _reset_device(device) -> bool:
+    """Tek bir cihazı reset et; cihaz hala meşgulse False döner"""
+    try:
+        print(f"🔄 Reset: Bus {device.bus:03d} Device {device.address:03d}")
+        device.reset()
+        print("   ✅ Reset başarılı")
+    except usb.core.USBError as e:
+        if _is_busy_error(e):
+            print(f"   ⚠️ Cihaz hala meşgul: {e}")
+            return False
+        print(f"   ⚠️ Reset hatası: {e}")
+    return True
+
+def reset_usb_device(vendor_id: int = ZEBRA_VENDOR_ID) -> bool:
     """Reset USB device to clear busy state"""
     print(f"\n🔄 USB cihaz reset ediliyor (Vendor ID: 0x{vendor_id:04x})...")
     
     try:
-        devices = list(usb.core.find(find_all=True, idVendor=vendor_id))
+        if vendor_id == ZEBRA_VENDOR_ID:
+            devices = _zebra_devices()
+        else:
+            devices = list(usb.core.find(find_all=True, idVendor=vendor_id))
         
         if not devices:
             print("❌ USB cihaz bulunamadı")
             return False
         
         for device in devices:
-            try:
-                print(f"🔄 Reset: Bus {device.bus:03d} Device {device.address:03d}")
-                device.reset()
-                print("   ✅ Reset başarılı")
-                time.sleep(2)  # Reset sonrası bekleme
-                
-            except usb.core.USBError as e:
-                if "busy" in str(e).lower() or "resource busy" in str(e).lower():
-                    print(f"   ⚠️ Cihaz hala meşgul: {e}")
-                    return False
-                else:
-                    print(f"   ⚠️ Reset hatası: {e}")
+            if not _reset_device(device):
+                return False
         
         return True
         
     except Exception as e:
         print(f"❌ Reset hatası: {e}")
         return False
+    finally:
+        # Reset sonrası cihazlar yeniden listelenmeli
+        _zebra_devices.cache_clear()
+
+def _wait_detached(device, interface_num: int, timeout: float = 0.5) -> bool:
+    """Kernel driver interface'i bırakana kadar (en fazla timeout saniye) bekle"""
+    return _wait_for(lambda: not device.is_kernel_driver_active(interface_num),
+                     timeout=timeout, interval=0.01)
+
+def _detach_kernel_drivers(device):
+    """Cihazın tüm interface'lerindeki kernel driver'ları ayır"""
+    try:
+        # Tüm interface'lerde kernel driver'ı kontrol et
+        config = device.get_active_configuration()
+        
+        for interface in config:
+            interface_num = interface.bInterfaceNumber
+            
+            if device.is_kernel_driver_active(interface_num):
+                print(f"🔓 Kernel driver detach: Interface {interface_num}")
+                device.detach_kernel_driver(interface_num)
+                _wait_detached(device, interface_num)
+            else:
+                print(f"✅ Interface {interface_num} zaten detached")
+        
+    except usb.core.USBError as e:
+        if _is_busy_error(e):
+            print(f"   ⚠️ Interface busy: {e}")
+        else:
+            print(f"   ⚠️ Detach hatası: {e}")
+    except Exception as e:
+        print(f"   ❌ Unexpected error: {e}")
 
 def unbind_kernel_driver() -> bool:
     """Unbind kernel driver from USB device"""
     print("\n🔓 Kernel driver unbind işlemi...")
     
     try:
-        devices = list(usb.core.find(find_all=True, idVendor=0x0a5f))
-        
-        for device in devices:
-            try:
-                # Tüm interface'lerde kernel driver'ı kontrol et
-                config = device.get_active_configuration()
-                
-                for interface in config:
-                    interface_num = interface.bInterfaceNumber
-                    
-                    if device.is_kernel_driver_active(interface_num):
-                        print(f"🔓 Kernel driver detach: Interface {interface_num}")
-                        device.detach_kernel_driver(interface_num)
-                        time.sleep(0.5)
-                    else:
-                        print(f"✅ Interface {interface_num} zaten detached")
-                
-            except usb.core.USBError as e:
-                if "busy" in str(e).lower():
-                    print(f"   ⚠️ Interface busy: {e}")
-                else:
-                    print(f"   ⚠️ Detach hatası: {e}")
-            except Exception as e:
-                print(f"   ❌ Unexpected error: {e}")
+        for device in _zebra_devices():
+            _detach_kernel_drivers(device)
         
         return True
         
@@ -173,6 +340,72 @@ def unbind_kernel_driver() -> bool:
         print(f"❌ Kernel driver unbind hatası: {e}")
         return False
 
+def _busy_devices() -> Optional[List[Any]]:
+    """Cihazları yeniden listele ve set_configuration ile dene
+    
+    Herhangi bir cihaz erişilebilirse boş liste döner. Meşgul (busy)
+    olmayan USB hataları testi düşürmez. Hala meşgul olan cihazların
+    listesini, hiç cihaz yoksa None döner.
+    """
+    _zebra_devices.cache_clear()
+    devices = _zebra_devices()
+    if not devices:
+        return None
+    
+    busy = []
+    errors = []
+    for device in devices:
+        try:
+            device.set_configuration()
+            return []
+        except usb.core.USBError as e:
+            if _is_busy_error(e):
+                busy.append(device)
+            else:
+                errors.append(e)
+    
+    if not busy:
+        for e in errors:
+            print(f"⚠️ Test: USB hatası - {e}")
+    return busy
+
+def _test_usb_access(timeout: float = 2.0) -> bool:
+    """Reset sonrası cihazları yeniden listele ve erişimi test et
+    
+    Reset cihazı yeniden enumerate edebilir; eski handle'lar kullanılmaz.
+    Sabit 2 saniye yerine bir cihaz erişilebilir olana kadar yoklanır.
+    """
+    print("\n🧪 USB cihaz erişim testi...")
+    
+    try:
+        busy = None
+        
+        def _accessible() -> bool:
+            nonlocal busy
+            busy = _busy_devices()
+            return busy == []
+        
+        if _wait_for(_accessible, timeout=timeout, interval=0.1):
+            print("✅ Test: USB cihaz erişimi başarılı")
+            return True
+        
+        if busy is None:
+            print("❌ Test: USB cihaz bulunamadı")
+        else:
+            for device in busy:
+                print(f"❌ Test: Cihaz hala busy - Bus {device.bus:03d} Device {device.address:03d}")
+        return False
+        
+    except Exception as e:
+        print(f"❌ Test hatası: {e}")
+        return False
+
+def _confirm(prompt: str) -> bool:
+    """Soruyu tek write ile yaz, cevabı tek readline ile oku"""
+    sys.stdout.write(prompt)
+    sys.stdout.flush()
+    return sys.stdin.readline().strip().lower() == 'y'
+
 def fix_usb_busy() -> bool:
     """Complete USB busy fix procedure"""
     print("🔧 USB Resource Busy (Errno 16) Düzeltme")
@@ -183,10 +416,10 @@ def fix_usb_busy() -> bool:
     
     # 2. Process'leri sonlandır
     if processes:
-        print(f"\n⚠️ {len(processes)} process USB cihazını kullanıyor!")
-        choice = input("Process'leri sonlandırmak istiyor musunuz? (y/N): ").lower()
+        prompt = (f"\n⚠️ {len(processes)} process USB cihazını kullanıyor!\n"
+                  "Process'leri sonlandırmak istiyor musunuz? (y/N): ")
         
-        if choice == 'y':
+        if _confirm(prompt):
             if not kill_usb_processes(processes):
                 print("❌ Bazı process'ler sonlandırılamadı")
                 return False
@@ -194,45 +427,16 @@ def fix_usb_busy() -> bool:
             print("❌ Process'ler sonlandırılmadı, sorun devam edebilir")
             return False
     
-    # 3. Kernel driver'ı unbind et
-    time.sleep(1)
+    # 3. Kernel driver'ı unbind et (tüm cihazlar)
     unbind_kernel_driver()
     
-    # 4. USB cihazı reset et
-    time.sleep(1)
+    # 4. USB cihazları reset et (tüm cihazlar)
     if not reset_usb_device():
         print("❌ USB reset başarısız")
         return False
     
-    # 5. Test et
-    time.sleep(2)
-    print("\n🧪 USB cihaz erişim testi...")
-    
-    try:
-        devices = list(usb.core.find(find_all=True, idVendor=0x0a5f))
-        
-        if not devices:
-            print("❌ Test: USB cihaz bulunamadı")
-            return False
-        
-        for device in devices:
-            try:
-                device.set_configuration()
-                print("✅ Test: USB cihaz erişimi başarılı")
-                return True
-                
-            except usb.core.USBError as e:
-                if "busy" in str(e).lower():
-                    print(f"❌ Test: Cihaz hala busy - {e}")
-                    return False
-                else:
-                    print(f"⚠️ Test: USB hatası - {e}")
-        
-    except Exception as e:
-        print(f"❌ Test hatası: {e}")
-        return False
-    
-    return True
+    # 5. Yeniden listelenen cihazlarla test et
+    return _test_usb_access()
 
 if __name__ == "__main__":
     print("🐧 Linux USB Resource Busy Fixer")
@@ -244,8 +448,7 @@ if __name__ == "__main__":
         print("Çalıştırın: sudo python3 fix_usb_busy.py")
         
         # Root olmadan da denenebilir
-        choice = input("\nRoot olmadan devam etmek istiyor musunuz? (y/N): ").lower()
-        if choice != 'y':
+        if not _confirm("\nRoot olmadan devam etmek istiyor musunuz? (y/N): "):
             sys.exit(1)
     
     success = fix_usb_busy()
@@ -2,11 +2,63 @@
 Label generation module for different printer types and formats
 """
 
+import os
 import time
-from typing import Dict, Any
+import string
+import itertools
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
 from abc import ABC, abstractmethod
 
 
+# Default for printed-at/timestamp fields; formatted only when the field is missing
+_TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Sequence numbers for pallet labels that arrive without palet_id / lot_no
+_palet_counter = itertools.count(1)
+_lot_counter = itertools.count(1)
+
+_TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class _SafeDict(dict):
+    """format_map mapping that leaves unknown placeholders untouched"""
+    
+    def __missing__(self, key: str) -> str:
+        return '{' + key + '}'
+
+
+def _load_template(path: str, fallback: str) -> str:
+    """Read a ZPL template; return the fallback if the file is missing"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return fallback
+
+
+def _compile_template(template: str) -> Tuple[Tuple[str, Optional[str], Optional[str], Optional[str]], ...]:
+    """Parse a str.format template into (literal, field, spec, conversion) segments"""
+    return tuple(string.Formatter().parse(template))
+
+
+_CONVERSIONS = {'r': repr, 's': str, 'a': ascii}
+
+
+def _render_template(segments, params: Dict[str, Any]) -> str:
+    """Fill pre-parsed template segments with named values (same output as str.format)"""
+    out = []
+    add = out.append
+    for literal, field, spec, conversion in segments:
+        add(literal)
+        if field is not None:
+            value = params[field]
+            if conversion:
+                value = _CONVERSIONS[conversion](value)
+            add(format(value, spec))
+    return "".join(out)
+
+
 class LabelGeneratorBase(ABC):
     """Base class for label generators"""
     
@@ -48,169 +100,98 @@ class ESCPOSLabelGenerator(LabelGeneratorBase):
     ALIGN_CENTER = f"{ESC}a\x01"
     ALIGN_RIGHT = f"{ESC}a\x02"
     
+    # Separators
+    SEP_EQ = "=" * 32 + "\n"
+    SEP_DASH = "-" * 32 + "\n"
+    SEP_EQ_SMALL = "=" * 20 + "\n"
+    
+    # Static label fragments, composed once at class load
+    LOCATION_HEADER = INIT + ALIGN_CENTER + BOLD_ON + "LOCATION LABEL\n" + BOLD_OFF + SEP_EQ
+    PALLET_HEADER = INIT + ALIGN_CENTER + BOLD_ON + "PALLET LABEL\n" + BOLD_OFF + SEP_EQ
+    TEST_HEADER = (INIT + ALIGN_CENTER + LARGE_FONT + BOLD_ON + "TEST LABEL\n"
+                   + BOLD_OFF + NORMAL_FONT + SEP_EQ_SMALL)
+    BODY_START = ALIGN_LEFT + NORMAL_FONT
+    FOOTER_SUFFIX = "\n" + CUT
+    TEST_FOOTER = SEP_EQ_SMALL + "Print Test Successful\n" + FOOTER_SUFFIX
+    
+    def _render(self, header: str, data: Dict[str, Any], body: Tuple[str, ...]) -> str:
+        """Wrap label body lines with the shared header, barcode and footer"""
+        barcode = data.get('barcode', '')
+        return "".join((
+            header,
+            f"*{barcode}*\n" if barcode else "",
+            self.BODY_START,
+            *body,
+            f"{self.SEP_DASH}"
+            f"Created: {(data.get('createdAt') or '')[:19]}\n"
+            f"Printed: {data.get('printedAt') or time.strftime(_TIMESTAMP_FORMAT)}\n",
+            self.FOOTER_SUFFIX,
+        ))
+    
     def generate_location_label(self, data: Dict[str, Any]) -> str:
         """Generate ESC/POS commands for location label"""
-        commands = []
-        
-        # Initialize printer
-        commands.append(self.INIT)
-        
-        # Header
-        commands.append(self.ALIGN_CENTER)
-        commands.append(self.BOLD_ON)
-        commands.append("LOCATION LABEL\n")
-        commands.append(self.BOLD_OFF)
-        commands.append("=" * 32 + "\n")
-        
-        # Barcode
-        barcode = data.get('barcode', '')
-        if barcode:
-            commands.append(f"*{barcode}*\n")
-        
-        # Location data
-        commands.append(self.ALIGN_LEFT)
-        commands.append(self.NORMAL_FONT)
-        
-        commands.append(f"Location: {data.get('locationName', 'N/A')}\n")
-        commands.append(f"Warehouse: {data.get('warehouseCode', 'N/A')}\n")
-        commands.append(f"Type: {data.get('locationType', 'N/A')}\n")
-        
         # Position info
         aisle = data.get('aisle', '')
         bay = data.get('bay', '')
         level = data.get('level', '')
         position = data.get('position', '')
         
+        position_line = ""
         if aisle or bay or level or position:
             pos_str = f"{aisle}-{bay}-{level}"
             if position:
                 pos_str += f"-{position}"
-            commands.append(f"Position: {pos_str}\n")
+            position_line = f"Position: {pos_str}\n"
         
         # Capacity info
         max_weight = data.get('maxWeight')
-        if max_weight:
-            commands.append(f"Max Weight: {max_weight} kg\n")
-        
         max_volume = data.get('maxVolume')
-        if max_volume:
-            commands.append(f"Max Volume: {max_volume} m³\n")
-        
-        # Footer
-        commands.append("-" * 32 + "\n")
-        commands.append(f"Created: {data.get('createdAt', '')[:19]}\n")
-        commands.append(f"Printed: {data.get('printedAt', time.strftime('%Y-%m-%d %H:%M:%S'))}\n")
-        
-        # Cut paper
-        commands.append("\n")
-        commands.append(self.CUT)
         
-        return "".join(commands)
+        return self._render(self.LOCATION_HEADER, data, (
+            # Location data
+            f"Location: {data.get('locationName', 'N/A')}\n"
+            f"Warehouse: {data.get('warehouseCode', 'N/A')}\n"
+            f"Type: {data.get('locationType', 'N/A')}\n",
+            position_line,
+            f"Max Weight: {max_weight} kg\n" if max_weight else "",
+            f"Max Volume: {max_volume} m³\n" if max_volume else "",
+        ))
     
     def generate_pallet_label(self, data: Dict[str, Any]) -> str:
         """Generate ESC/POS commands for pallet label"""
-        commands = []
-        
-        # Initialize printer
-        commands.append(self.INIT)
-        
-        # Header
-        commands.append(self.ALIGN_CENTER)
-        commands.append(self.BOLD_ON)
-        commands.append("PALLET LABEL\n")
-        commands.append(self.BOLD_OFF)
-        commands.append("=" * 32 + "\n")
-        
-        # Barcode
-        barcode = data.get('barcode', '')
-        if barcode:
-            commands.append(f"*{barcode}*\n")
-        
-        # Pallet data
-        commands.append(self.ALIGN_LEFT)
-        commands.append(self.NORMAL_FONT)
-        
-        commands.append(f"Pallet ID: {data.get('id', 'N/A')}\n")
-        commands.append(f"Type: {data.get('palletType', 'N/A')}\n")
-        commands.append(f"Status: {data.get('status', 'N/A')}\n")
-        commands.append(f"Warehouse: {data.get('warehouseCode', 'N/A')}\n")
-        
-        # Weight info
-        current_weight = data.get('currentWeight', 0)
-        max_weight = data.get('maxWeight', 0)
-        commands.append(f"Weight: {current_weight}/{max_weight} kg\n")
-        
-        # Volume info
-        current_volume = data.get('currentVolume', 0)
-        max_volume = data.get('maxVolume', 0)
-        commands.append(f"Volume: {current_volume}/{max_volume} m³\n")
-        
-        # Location info
         location_id = data.get('locationId')
-        if location_id:
-            commands.append(f"Location ID: {location_id}\n")
         
-        # Footer
-        commands.append("-" * 32 + "\n")
-        commands.append(f"Created: {data.get('createdAt', '')[:19]}\n")
-        commands.append(f"Printed: {data.get('printedAt', time.strftime('%Y-%m-%d %H:%M:%S'))}\n")
-        
-        # Cut paper
-        commands.append("\n")
-        commands.append(self.CUT)
-        
-        return "".join(commands)
+        return self._render(self.PALLET_HEADER, data, (
+            # Pallet data
+            f"Pallet ID: {data.get('id', 'N/A')}\n"
+            f"Type: {data.get('palletType', 'N/A')}\n"
+            f"Status: {data.get('status', 'N/A')}\n"
+            f"Warehouse: {data.get('warehouseCode', 'N/A')}\n"
+            # Weight and volume info
+            f"Weight: {data.get('currentWeight', 0)}/{data.get('maxWeight', 0)} kg\n"
+            f"Volume: {data.get('currentVolume', 0)}/{data.get('maxVolume', 0)} m³\n",
+            # Location info
+            f"Location ID: {location_id}\n" if location_id else "",
+        ))
     
     def generate_test_label(self, data: Dict[str, Any]) -> str:
         """Generate ESC/POS commands for test label"""
-        commands = []
-        
-        # Initialize printer
-        commands.append(self.INIT)
-        
-        # Header
-        commands.append(self.ALIGN_CENTER)
-        commands.append(self.LARGE_FONT)
-        commands.append(self.BOLD_ON)
-        commands.append("TEST LABEL\n")
-        commands.append(self.BOLD_OFF)
-        commands.append(self.NORMAL_FONT)
-        commands.append("=" * 20 + "\n")
-        
-        # Test message
+        # Test message and timestamp
         message = data.get('message', 'Printer Test')
-        commands.append(f"{message}\n")
-        
-        # Timestamp
-        timestamp = data.get('timestamp', time.strftime('%Y-%m-%d %H:%M:%S'))
-        commands.append(f"Time: {timestamp}\n")
+        timestamp = data.get('timestamp') or time.strftime(_TIMESTAMP_FORMAT)
         
-        # Footer
-        commands.append("=" * 20 + "\n")
-        commands.append("Print Test Successful\n")
-        
-        # Cut paper
-        commands.append("\n")
-        commands.append(self.CUT)
-        
-        return "".join(commands)
+        return f"{self.TEST_HEADER}{message}\nTime: {timestamp}\n{self.TEST_FOOTER}"
 
 
 class ZPLLabelGenerator(LabelGeneratorBase):
     """ZPL (Zebra Programming Language) command generator"""
     
-    def generate_location_label(self, data: Dict[str, Any]) -> str:
-        """Generate ZPL commands for location label using location.zpl template"""
-        import os
-        
-        # Read the location.zpl template
-        template_path = os.path.join(os.path.dirname(__file__), 'location.zpl')
-        try:
-            with open(template_path, 'r', encoding='utf-8') as f:
-                zpl_template = f.read()
-        except FileNotFoundError:
-            # Fallback to embedded template if file not found
-            zpl_template = """^XA
+    # Templates are resolved next to this module and read once at import
+    LOCATION_TEMPLATE_PATH = os.path.join(_TEMPLATE_DIR, 'location.zpl')
+    PALLET_TEMPLATE_PATH = os.path.join(_TEMPLATE_DIR, 'palet.zpl')
+    
+    # Embedded templates used when the files are not found
+    LOCATION_FALLBACK_TEMPLATE = """^XA
         ^FX set width and height
         ^PW799 ^FX size in points = 100 mm width
         ^LL630   ^FX size in points = 80 mm height
@@ -230,81 +211,33 @@ class ZPLLabelGenerator(LabelGeneratorBase):
 
         ^FO25,55
         ^A0N,50,50
-        ^FDBil Plastik Ambalaj / Ana Fabrika^FS
+        ^FDBil Plastik Ambalaj / {warehouse_code}^FS
 
         ^FO10,110^GB750,2,2^FS 
         ^FX end of CompanySection
 
         ^FO18,120
         ^A0N,35,35
-        ^FDSevkiyat Ürün Deposu  ^FS  ^FS ^FX 30 charecter max        
+        ^FD{location_name}  ^FS  ^FS ^FX 30 charecter max        
         ^FX start bottom table
         ^CF0,40
         ^FO10,200^FB375,1,0,C^FDAlt Raf^FS
-        ^A0N,30,30^FO10,250^FB375,1,0,C^FDDP-S-{i}1^FS
+        ^A0N,30,30^FO10,250^FB375,1,0,C^FDDP-S-{location_id}1^FS
         ^FO90,320
         ^BQN,2,10
-        ^FDLA,DP-S-{i}1^FS
+        ^FDLA,DP-S-{location_id}1^FS
 
         ^CF0,40
         ^FO390,200^FB375,1,0,C^FDÜst Raf^FS
-        ^A0N,30,30^FO390,250^FB375,1,0,C^FDDP-S-{i}2^FS
+        ^A0N,30,30^FO390,250^FB375,1,0,C^FDDP-S-{location_id}2^FS
         ^FO470,320
         ^BQN,2,10
-        ^FDLA,DP-S-{i}2^FS
+        ^FDLA,DP-S-{location_id}2^FS
         ^FO10,170^GB375,450,2^FS
         ^FO385,170^GB375,450,2^FS
         ^XZ"""
-        
-        # Extract data for template placeholders
-        location_id = data.get('id', data.get('locationId', '1'))
-        location_name = data.get('locationName', 'Sevkiyat Ürün Deposu')
-        warehouse_code = data.get('warehouseCode', 'Ana Fabrika')
-        barcode = data.get('barcode', f'LOC{location_id:06d}')
-        
-        # Replace placeholders in template
-        # {i} placeholder is used for location ID in the template
-        zpl_command = zpl_template.replace('{i}', str(location_id))
-        
-        # If we want to customize company/warehouse info, we can add more replacements
-        if 'locationName' in data and data['locationName']:
-            # Replace the default location name with actual data
-            zpl_command = zpl_command.replace('Sevkiyat Ürün Deposu', location_name)
-        
-        if 'warehouseCode' in data and data['warehouseCode']:
-            # Replace the default warehouse with actual data  
-            zpl_command = zpl_command.replace('Ana Fabrika', warehouse_code)
-        
-        return zpl_command
     
-    def generate_pallet_label(self, data: Dict[str, Any]) -> str:
-        """Generate ZPL commands for pallet label using the palet.zpl template"""
-        import time
-        from datetime import datetime
-        
-        # Get current date for defaults
-        current_date = datetime.now().strftime('%Y-%m-%d')
-        
-        # Extract data with defaults matching the template placeholders
-        firma_adi = data.get('firma_adi', data.get('firma', 'Bil Plastik Ambalaj'))
-        depo_adi = data.get('depo_adi', data.get('depo', 'Ana Fabrika'))
-        locationId = data.get('locationId', data.get('locationId', 'Sevkiyat Ürün Deposu'))
-        barcode = data.get('barcode', data.get('barcode', 'barcode'))
-        urun_adi = data.get('urun_adi', data.get('product_name', ''))
-        teslim_firma = data.get('teslim_firma', data.get('receiving_company', 'Teslim Alınan Firma'))
-        siparis_tarihi = data.get('siparis_tarihi', data.get('order_date', current_date))
-        palet_id = data.get('palet_id', f'PLT{int(time.time())%10000:04d}')
-        lot_no = data.get('lot_no', f'LOT{int(time.time())%1000:03d}')
-        durum = data.get('durum', data.get('status', 'HAZIR'))
-        note = data.get('note', data.get('note', ''))
-        
-        # Read the palet.zpl template
-        try:
-            with open('./palet.zpl', 'r', encoding='utf-8') as f:
-                zpl_template = f.read()
-        except FileNotFoundError:
-            # Fallback template if file not found
-            zpl_template = """^XA
+    PALLET_FALLBACK_TEMPLATE = """^XA
 ^PW799
 ^LL630
 ^CI28
@@ -331,64 +264,94 @@ class ZPLLabelGenerator(LabelGeneratorBase):
 ^FO620,470^BQN,2,6^FDLA,{hammadde_ismi}^FS
 ^FO600,460^GB160,160,2^FS
 ^XZ"""
+    
+    # Loaded (and, for the pallet label, pre-parsed) once at class definition
+    LOCATION_TEMPLATE = _load_template(LOCATION_TEMPLATE_PATH, LOCATION_FALLBACK_TEMPLATE)
+    PALLET_TEMPLATE_SEGMENTS = _compile_template(
+        _load_template(PALLET_TEMPLATE_PATH, PALLET_FALLBACK_TEMPLATE))
+    
+    # Static start of the test label: label start, size and title
+    TEST_LABEL_START = "^XA\n^LH0,0\n^PW400\n^FO100,50\n^CF0,40\n^FDTEST LABEL^FS\n"
+    
+    def generate_location_label(self, data: Dict[str, Any]) -> str:
+        """Generate ZPL commands for location label using location.zpl template"""
+        # Default texts are kept when the name or warehouse is missing/empty
+        params = {
+            'location_id': str(data.get('id', data.get('locationId', '1'))),
+            'location_name': data.get('locationName') or 'Sevkiyat Ürün Deposu',
+            'warehouse_code': data.get('warehouseCode') or 'Ana Fabrika',
+        }
+        
+        # Single pass over the template; unknown placeholders are left as-is
+        zpl_command = self.LOCATION_TEMPLATE.format_map(_SafeDict(params))
+        
+        return zpl_command
+    
+    def generate_pallet_label(self, data: Dict[str, Any]) -> str:
+        """Generate ZPL commands for pallet label using the palet.zpl template"""
+        # Extract data with defaults matching the template placeholders
+        firma_adi = data.get('firma_adi', data.get('firma', 'Bil Plastik Ambalaj'))
+        depo_adi = data.get('depo_adi', data.get('depo', 'Ana Fabrika'))
+        locationId = data.get('locationId', data.get('locationId', 'Sevkiyat Ürün Deposu'))
+        barcode = data.get('barcode', data.get('barcode', 'barcode'))
+        urun_adi = data.get('urun_adi', data.get('product_name', ''))
+        teslim_firma = data.get('teslim_firma', data.get('receiving_company', 'Teslim Alınan Firma'))
+        # Current date is only looked up when no order date is given
+        siparis_tarihi = (data.get('siparis_tarihi') or data.get('order_date')
+                          or datetime.now().strftime('%Y-%m-%d'))
+        palet_id = data.get('palet_id') or f'PLT{next(_palet_counter) % 10000:04d}'
+        lot_no = data.get('lot_no') or f'LOT{next(_lot_counter) % 1000:03d}'
+        durum = data.get('durum', data.get('status', 'HAZIR'))
+        note = data.get('note', data.get('note', ''))
         
         # Replace placeholders with actual data
-        zpl_command = zpl_template.format(
-            firma_adi=firma_adi,
-            depo_adi=depo_adi,
-            sevkiyat_bilgisi=locationId,
-            hammadde_ismi=barcode,
-            urun_adi=urun_adi,
-            teslim_firma=teslim_firma,
-            siparis_tarihi=siparis_tarihi,
-            palet_id=palet_id,
-            lot_no=lot_no,
-            durum=durum,
-            note= note
-        )
+        zpl_command = _render_template(self.PALLET_TEMPLATE_SEGMENTS, {
+            'firma_adi': firma_adi,
+            'depo_adi': depo_adi,
+            'sevkiyat_bilgisi': locationId,
+            'hammadde_ismi': barcode,
+            'urun_adi': urun_adi,
+            'teslim_firma': teslim_firma,
+            'siparis_tarihi': siparis_tarihi,
+            'palet_id': palet_id,
+            'lot_no': lot_no,
+            'durum': durum,
+            'note': note,
+        })
         
         return zpl_command
     
     def generate_test_label(self, data: Dict[str, Any]) -> str:
         """Generate ZPL commands for test label"""
-        zpl = []
-        
-        # Start label
-        zpl.append("^XA")
-        
-        # Set label size
-        zpl.append("^LH0,0")
-        zpl.append("^PW400")
-        
-        # Title
-        zpl.append("^FO100,50")
-        zpl.append("^CF0,40")
-        zpl.append("^FDTEST LABEL^FS")
-        
-        # Message
         message = data.get('message', 'Printer Test')
-        zpl.append("^FO50,120")
-        zpl.append("^CF0,25")
-        zpl.append(f"^FD{message}^FS")
+        timestamp = data.get('timestamp') or time.strftime('%H:%M:%S')
         
-        # Timestamp
-        timestamp = data.get('timestamp', time.strftime('%H:%M:%S'))
-        zpl.append("^FO50,160")
-        zpl.append("^CF0,20")
-        zpl.append(f"^FDTime: {timestamp}^FS")
-        
-        # End label
-        zpl.append("^XZ")
-        
-        return "\n".join(zpl)
+        # Start label, label size and title are fixed; message and time follow
+        return (f"{self.TEST_LABEL_START}"
+                f"^FO50,120\n^CF0,25\n^FD{message}^FS\n"
+                f"^FO50,160\n^CF0,20\n^FDTime: {timestamp}^FS\n"
+                "^XZ")
+
+
+# Generators are stateless, so one shared instance per format is enough
+_ESCPOS = ESCPOSLabelGenerator()
+_ZPL = ZPLLabelGenerator()
+
+_GENERATORS_BY_TYPE = {
+    "thermal": _ESCPOS,
+    "escpos": _ESCPOS,
+    "zebra": _ZPL,
+    "zpl": _ZPL,
+}
 
 
 def get_label_generator(printer_type: str = "thermal") -> LabelGeneratorBase:
-    """Factory function to get appropriate label generator"""
-    if printer_type.lower() in ["thermal", "escpos"]:
-        return ESCPOSLabelGenerator()
-    elif printer_type.lower() in ["zebra", "zpl"]:
-        return ZPLLabelGenerator()
-    else:
-        # Default to ESC/POS
-        return ESCPOSLabelGenerator()
+    """Factory function to get appropriate label generator
+    
+    Returns a shared instance; unknown printer types default to ESC/POS.
+    """
+    # Callers normally pass the lowercase name, so try it before lowering
+    generator = _GENERATORS_BY_TYPE.get(printer_type)
+    if generator is None:
+        generator = _GENERATORS_BY_TYPE.get(printer_type.lower(), _ESCPOS)
+    return generator
@@ -15,215 +15,260 @@ Features:
 Author: Copilot
 """
 
-import time
+import html
+import functools
+import itertools
 from datetime import datetime
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
-@dataclass
-class PalletItem:
-    """Individual item on the pallet"""
-    product_code: str
-    product_name: str
-    quantity: int
-    unit: str
-    weight_per_unit: float
-    total_weight: float
-    lot_number: Optional[str] = None
-    production_date: Optional[str] = None
+# Marks a key that is absent from the input data (None is a valid value)
+_MISSING = object()
 
+# Sequence numbers for summaries that arrive without a pallet ID
+_pallet_id_counter = itertools.count(1)
 
-@dataclass
-class PalletSummary:
-    """Complete pallet summary data"""
-    pallet_id: str
-    company_name: str
-    warehouse: str
-    receiving_company: str
-    order_date: str
-    total_items: int
-    total_weight: float
-    net_weight: float
-    status: str
-    items: List[PalletItem]
-    created_by: Optional[str] = None
-    notes: Optional[str] = None
 
+def _html_text(value: Any) -> str:
+    """Escape a data value for safe use inside HTML text or attributes"""
+    return html.escape(str(value))
 
-class PalletSummaryGenerator:
-    """Generator for A5 format pallet summaries"""
-    
-    # A5 dimensions in characters (approximately 80 characters wide for 10pt font)
-    LINE_WIDTH = 80
-    PAGE_HEIGHT = 60  # lines
-    
-    def __init__(self):
-        self.current_date = datetime.now()
+
+def _pick(data: Dict[str, Any], *keys: str, default: Any = None) -> Any:
+    """Return the value of the first key present in data
     
-    def generate_html_summary(self, pallet_data: Dict[str, Any]) -> str:
-        """Generate HTML format pallet summary for A5 printing"""
-        summary = self._parse_pallet_data(pallet_data)
-        
-        html = f"""
-<!DOCTYPE html>
-<html lang="tr">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Palet Özet Raporu - {summary.pallet_id}</title>
-    <style>
-        @page {{
+    Equivalent to nested data.get(a, data.get(b, default)) calls, but stops
+    at the first hit instead of evaluating every fallback.
+    """
+    for key in keys:
+        if key in data:
+            return data[key]
+    return default
+
+
+# Static stylesheet for the HTML summary, kept out of the per-call f-string
+_HTML_STYLE = """        @page {
             size: A5;
             margin: 15mm;
-        }}
+        }
         
-        body {{
+        body {
             font-family: 'Arial', sans-serif;
             font-size: 10pt;
             line-height: 1.2;
             margin: 0;
             padding: 0;
             color: #333;
-        }}
+        }
         
-        .header {{
+        .header {
             text-align: center;
             border-bottom: 2px solid #333;
             padding-bottom: 10px;
             margin-bottom: 15px;
-        }}
+        }
         
-        .company-name {{
+        .company-name {
             font-size: 14pt;
             font-weight: bold;
             margin-bottom: 5px;
-        }}
+        }
         
-        .report-title {{
+        .report-title {
             font-size: 12pt;
             font-weight: bold;
             color: #666;
-        }}
+        }
         
-        .info-section {{
+        .info-section {
             margin-bottom: 15px;
-        }}
+        }
         
-        .info-table {{
+        .info-table {
             width: 100%;
             border-collapse: collapse;
             margin-bottom: 10px;
-        }}
+        }
         
-        .info-table td {{
+        .info-table td {
             padding: 3px 5px;
             border: 1px solid #ddd;
             font-size: 9pt;
-        }}
+        }
         
-        .info-table .label {{
+        .info-table .label {
             background-color: #f5f5f5;
             font-weight: bold;
             width: 40%;
-        }}
+        }
         
-        .items-section {{
+        .items-section {
             margin-bottom: 15px;
-        }}
+        }
         
-        .items-title {{
+        .items-title {
             font-size: 11pt;
             font-weight: bold;
             margin-bottom: 10px;
             border-bottom: 1px solid #333;
             padding-bottom: 3px;
-        }}
+        }
         
-        .items-table {{
+        .items-table {
             width: 100%;
             border-collapse: collapse;
             font-size: 8pt;
-        }}
+        }
         
-        .items-table th {{
+        .items-table th {
             background-color: #333;
             color: white;
             padding: 4px 2px;
             text-align: left;
             font-weight: bold;
-        }}
+        }
         
-        .items-table td {{
+        .items-table td {
             padding: 3px 2px;
             border: 1px solid #ddd;
-        }}
+        }
         
-        .items-table tr:nth-child(even) {{
+        .items-table tr:nth-child(even) {
             background-color: #f9f9f9;
-        }}
+        }
         
-        .summary-section {{
+        .summary-section {
             border-top: 2px solid #333;
             padding-top: 10px;
             margin-top: 15px;
-        }}
+        }
         
-        .summary-table {{
+        .summary-table {
             width: 100%;
             border-collapse: collapse;
-        }}
+        }
         
-        .summary-table td {{
+        .summary-table td {
             padding: 4px 5px;
             font-weight: bold;
-        }}
+        }
         
-        .summary-table .total-row {{
+        .summary-table .total-row {
             background-color: #333;
             color: white;
-        }}
+        }
         
-        .footer {{
+        .footer {
             margin-top: 15px;
             text-align: center;
             font-size: 8pt;
             color: #666;
             border-top: 1px solid #ddd;
             padding-top: 5px;
-        }}
+        }
         
-        .status {{
+        .status {
             display: inline-block;
             padding: 2px 8px;
             border-radius: 3px;
             font-weight: bold;
             font-size: 9pt;
-        }}
+        }
         
-        .status.ready {{
+        .status.ready {
             background-color: #4CAF50;
             color: white;
-        }}
+        }
         
-        .status.pending {{
+        .status.pending {
             background-color: #FF9800;
             color: white;
-        }}
+        }
         
-        .status.shipped {{
+        .status.shipped {
             background-color: #2196F3;
             color: white;
-        }}
+        }
+        
+        @media print {
+            body { -webkit-print-color-adjust: exact; }
+        }
+"""
+
+
+@dataclass
+class PalletItem:
+    """Individual item on the pallet"""
+    product_code: str
+    product_name: str
+    quantity: int
+    unit: str
+    weight_per_unit: float
+    total_weight: float
+    lot_number: Optional[str] = None
+    production_date: Optional[str] = None
+
+
+@dataclass
+class PalletSummary:
+    """Complete pallet summary data"""
+    pallet_id: str
+    company_name: str
+    warehouse: str
+    receiving_company: str
+    order_date: str
+    total_items: int
+    total_weight: float
+    net_weight: float
+    status: str
+    items: List[PalletItem]
+    created_by: Optional[str] = None
+    notes: Optional[str] = None
+    tare_weight: float = field(init=False)
+    
+    def __post_init__(self):
+        # Derived once here instead of in every report template
+        self.tare_weight = self.total_weight - self.net_weight
+
+
+class PalletSummaryGenerator:
+    """Generator for A5 format pallet summaries"""
+    
+    # A5 dimensions in characters (approximately 80 characters wide for 10pt font)
+    LINE_WIDTH = 80
+    PAGE_HEIGHT = 60  # lines
+    
+    # Static lines of the plain text summary, built once
+    SEP_EQ = "=" * LINE_WIDTH
+    SEP_DASH = "-" * LINE_WIDTH
+    TEXT_TITLE = "PALET ÖZET RAPORU".center(LINE_WIDTH)
+    TEXT_ITEMS_HEADER = f"{'Kod':<12} {'Ürün Adı':<25} {'Adet':<6} {'Birim':<6} {'B.Ağ.':<8} {'T.Ağ.':<8} {'Lot':<8}"
+    
+    # CSS class per lowercased status; unknown statuses render as pending
+    STATUS_CLASSES = {
+        'hazır': 'ready', 'ready': 'ready', 'completed': 'ready',
+        'beklemede': 'pending', 'pending': 'pending', 'processing': 'pending',
+        'sevk edildi': 'shipped', 'shipped': 'shipped', 'delivered': 'shipped',
+    }
+    
+    def generate_html_summary(self, pallet_data: Dict[str, Any]) -> str:
+        """Generate HTML format pallet summary for A5 printing"""
+        summary = self._parse_pallet_data(pallet_data)
+        report_date = datetime.now()
         
-        @media print {{
-            body {{ -webkit-print-color-adjust: exact; }}
-        }}
-    </style>
+        head = f"""<!DOCTYPE html>
+<html lang="tr">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Palet Özet Raporu - {_html_text(summary.pallet_id)}</title>
+    <style>
+{_HTML_STYLE}    </style>
 </head>
 <body>
     <div class="header">
-        <div class="company-name">{summary.company_name}</div>
+        <div class="company-name">{_html_text(summary.company_name)}</div>
         <div class="report-title">PALET ÖZET RAPORU</div>
     </div>
     
@@ -231,19 +276,19 @@ class PalletSummaryGenerator:
         <table class="info-table">
             <tr>
                 <td class="label">Palet ID:</td>
-                <td>{summary.pallet_id}</td>
+                <td>{_html_text(summary.pallet_id)}</td>
                 <td class="label">Durum:</td>
-                <td><span class="status {self._get_status_class(summary.status)}">{summary.status}</span></td>
+                <td><span class="status {self._get_status_class(summary.status)}">{_html_text(summary.status)}</span></td>
             </tr>
             <tr>
                 <td class="label">Depo:</td>
-                <td>{summary.warehouse}</td>
+                <td>{_html_text(summary.warehouse)}</td>
                 <td class="label">Sipariş Tarihi:</td>
-                <td>{summary.order_date}</td>
+                <td>{_html_text(summary.order_date)}</td>
             </tr>
             <tr>
                 <td class="label">Teslim Alacak Firma:</td>
-                <td colspan="3">{summary.receiving_company}</td>
+                <td colspan="3">{_html_text(summary.receiving_company)}</td>
             </tr>
         </table>
     </div>
@@ -265,21 +310,20 @@ class PalletSummaryGenerator:
             <tbody>
         """
         
-        # Add items
-        for item in summary.items:
-            html += f"""
+        # Add items (collected and joined once instead of growing one string)
+        rows = [f"""
                 <tr>
-                    <td>{item.product_code}</td>
-                    <td>{item.product_name}</td>
-                    <td style="text-align: right;">{item.quantity}</td>
-                    <td>{item.unit}</td>
+                    <td>{_html_text(item.product_code)}</td>
+                    <td>{_html_text(item.product_name)}</td>
+                    <td style="text-align: right;">{_html_text(item.quantity)}</td>
+                    <td>{_html_text(item.unit)}</td>
                     <td style="text-align: right;">{item.weight_per_unit:.2f} kg</td>
                     <td style="text-align: right;">{item.total_weight:.2f} kg</td>
-                    <td>{item.lot_number or '-'}</td>
+                    <td>{_html_text(item.lot_number or '-')}</td>
                 </tr>
-            """
+            """ for item in summary.items]
         
-        html += f"""
+        tail = f"""
             </tbody>
         </table>
     </div>
@@ -296,34 +340,34 @@ class PalletSummaryGenerator:
                 <td style="background-color: #f5f5f5;">NET AĞIRLIK:</td>
                 <td style="text-align: right; background-color: #f5f5f5;">{summary.net_weight:.2f} kg</td>
                 <td style="background-color: #f5f5f5;">DARA AĞIRLIĞI:</td>
-                <td style="text-align: right; background-color: #f5f5f5;">{summary.total_weight - summary.net_weight:.2f} kg</td>
+                <td style="text-align: right; background-color: #f5f5f5;">{summary.tare_weight:.2f} kg</td>
             </tr>
         </table>
     </div>
     
     <div class="footer">
-        <p>Rapor Tarihi: {self.current_date.strftime('%d.%m.%Y %H:%M:%S')}</p>
-        {f'<p>Hazırlayan: {summary.created_by}</p>' if summary.created_by else ''}
-        {f'<p>Not: {summary.notes}</p>' if summary.notes else ''}
+        <p>Rapor Tarihi: {report_date.strftime('%d.%m.%Y %H:%M:%S')}</p>
+        {f'<p>Hazırlayan: {_html_text(summary.created_by)}</p>' if summary.created_by else ''}
+        {f'<p>Not: {_html_text(summary.notes)}</p>' if summary.notes else ''}
         <p>Bu belge bilgisayar ortamında oluşturulmuştur.</p>
     </div>
 </body>
-</html>
-        """
+</html>"""
         
-        return html.strip()
+        return "".join((head, *rows, tail))
     
     def generate_text_summary(self, pallet_data: Dict[str, Any]) -> str:
         """Generate plain text format pallet summary for basic printers"""
         summary = self._parse_pallet_data(pallet_data)
+        report_date = datetime.now()
         
         lines = []
         
         # Header
-        lines.append("=" * self.LINE_WIDTH)
+        lines.append(self.SEP_EQ)
         lines.append(summary.company_name.center(self.LINE_WIDTH))
-        lines.append("PALET ÖZET RAPORU".center(self.LINE_WIDTH))
-        lines.append("=" * self.LINE_WIDTH)
+        lines.append(self.TEXT_TITLE)
+        lines.append(self.SEP_EQ)
         lines.append("")
         
         # Basic info
@@ -331,16 +375,15 @@ class PalletSummaryGenerator:
         lines.append(f"Depo: {summary.warehouse}".ljust(40) + f"Sipariş Tarihi: {summary.order_date}")
         lines.append(f"Teslim Alacak Firma: {summary.receiving_company}")
         lines.append("")
-        lines.append("-" * self.LINE_WIDTH)
+        lines.append(self.SEP_DASH)
         
         # Items header
         lines.append(f"PALET İÇERİĞİ ({summary.total_items} Kalem)")
-        lines.append("-" * self.LINE_WIDTH)
+        lines.append(self.SEP_DASH)
         
         # Items table header
-        header = f"{'Kod':<12} {'Ürün Adı':<25} {'Adet':<6} {'Birim':<6} {'B.Ağ.':<8} {'T.Ağ.':<8} {'Lot':<8}"
-        lines.append(header)
-        lines.append("-" * self.LINE_WIDTH)
+        lines.append(self.TEXT_ITEMS_HEADER)
+        lines.append(self.SEP_DASH)
         
         # Items
         for item in summary.items:
@@ -354,14 +397,14 @@ class PalletSummaryGenerator:
             lines.append(line)
         
         # Summary
-        lines.append("-" * self.LINE_WIDTH)
+        lines.append(self.SEP_DASH)
         lines.append(f"TOPLAM KALEM: {summary.total_items}".ljust(40) + f"BRÜT AĞIRLIK: {summary.total_weight:.2f} kg")
-        lines.append(f"NET AĞIRLIK: {summary.net_weight:.2f} kg".ljust(40) + f"DARA: {summary.total_weight - summary.net_weight:.2f} kg")
-        lines.append("=" * self.LINE_WIDTH)
+        lines.append(f"NET AĞIRLIK: {summary.net_weight:.2f} kg".ljust(40) + f"DARA: {summary.tare_weight:.2f} kg")
+        lines.append(self.SEP_EQ)
         
         # Footer
         lines.append("")
-        lines.append(f"Rapor Tarihi: {self.current_date.strftime('%d.%m.%Y %H:%M:%S')}")
+        lines.append(f"Rapor Tarihi: {report_date.strftime('%d.%m.%Y %H:%M:%S')}")
         if summary.created_by:
             lines.append(f"Hazırlayan: {summary.created_by}")
         if summary.notes:
@@ -372,36 +415,40 @@ class PalletSummaryGenerator:
     def _parse_pallet_data(self, data: Dict[str, Any]) -> PalletSummary:
         """Parse pallet data into structured format"""
         # Extract basic pallet info
-        pallet_id = data.get('palet_id', data.get('pallet_id', f'PLT{int(time.time())%10000:04d}'))
-        company_name = data.get('firma_adi', data.get('company_name', 'Bil Plastik Ambalaj'))
-        warehouse = data.get('depo_adi', data.get('warehouse', 'Ana Fabrika'))
-        receiving_company = data.get('teslim_firma', data.get('receiving_company', 'Müşteri Firması'))
-        order_date = data.get('siparis_tarihi', data.get('order_date', datetime.now().strftime('%Y-%m-%d')))
-        status = data.get('durum', data.get('status', 'HAZIR'))
-        total_weight = float(data.get('brut_kg', data.get('gross_weight', 25.0)))
-        net_weight = float(data.get('net_kg', data.get('net_weight', 24.5)))
+        pallet_id = _pick(data, 'palet_id', 'pallet_id', default=_MISSING)
+        if pallet_id is _MISSING:
+            pallet_id = f'PLT{next(_pallet_id_counter) % 10000:04d}'
+        company_name = _pick(data, 'firma_adi', 'company_name', default='Bil Plastik Ambalaj')
+        warehouse = _pick(data, 'depo_adi', 'warehouse', default='Ana Fabrika')
+        receiving_company = _pick(data, 'teslim_firma', 'receiving_company', default='Müşteri Firması')
+        order_date = _pick(data, 'siparis_tarihi', 'order_date', default=_MISSING)
+        if order_date is _MISSING:
+            order_date = datetime.now().strftime('%Y-%m-%d')
+        status = _pick(data, 'durum', 'status', default='HAZIR')
+        total_weight = float(_pick(data, 'brut_kg', 'gross_weight', default=25.0))
+        net_weight = float(_pick(data, 'net_kg', 'net_weight', default=24.5))
         
         # Parse items from various possible formats
         items = []
-        items_data = data.get('items', data.get('pallet_items', []))
+        items_data = _pick(data, 'items', 'pallet_items', default=[])
         
         if items_data:
             # If explicit items list provided
             for item_data in items_data:
                 item = PalletItem(
-                    product_code=item_data.get('product_code', item_data.get('kod', 'ÜRÜN001')),
-                    product_name=item_data.get('product_name', item_data.get('ad', 'Ürün Adı')),
-                    quantity=int(item_data.get('quantity', item_data.get('adet', 1))),
-                    unit=item_data.get('unit', item_data.get('birim', 'adet')),
-                    weight_per_unit=float(item_data.get('weight_per_unit', item_data.get('birim_agirlik', 1.0))),
-                    total_weight=float(item_data.get('total_weight', item_data.get('toplam_agirlik', 1.0))),
-                    lot_number=item_data.get('lot_number', item_data.get('lot_no')),
-                    production_date=item_data.get('production_date', item_data.get('uretim_tarihi'))
+                    product_code=_pick(item_data, 'product_code', 'kod', default='ÜRÜN001'),
+                    product_name=_pick(item_data, 'product_name', 'ad', default='Ürün Adı'),
+                    quantity=int(_pick(item_data, 'quantity', 'adet', default=1)),
+                    unit=_pick(item_data, 'unit', 'birim', default='adet'),
+                    weight_per_unit=float(_pick(item_data, 'weight_per_unit', 'birim_agirlik', default=1.0)),
+                    total_weight=float(_pick(item_data, 'total_weight', 'toplam_agirlik', default=1.0)),
+                    lot_number=_pick(item_data, 'lot_number', 'lot_no'),
+                    production_date=_pick(item_data, 'production_date', 'uretim_tarihi')
                 )
                 items.append(item)
         else:
             # Generate default item from main product info if no items list
-            product_name = data.get('hammadde_ismi', data.get('urun_adi', data.get('product_name', 'Hammadde')))
+            product_name = _pick(data, 'hammadde_ismi', 'urun_adi', 'product_name', default='Hammadde')
             
             item = PalletItem(
                 product_code=data.get('product_code', 'HMMD001'),
@@ -426,23 +473,16 @@ class PalletSummaryGenerator:
             net_weight=net_weight,
             status=status,
             items=items,
-            created_by=data.get('created_by', data.get('operator')),
-            notes=data.get('notes', data.get('notlar'))
+            created_by=_pick(data, 'created_by', 'operator'),
+            notes=_pick(data, 'notes', 'notlar')
         )
     
     def _get_status_class(self, status: str) -> str:
         """Get CSS class for status"""
-        status_lower = status.lower()
-        if status_lower in ['hazır', 'ready', 'completed']:
-            return 'ready'
-        elif status_lower in ['beklemede', 'pending', 'processing']:
-            return 'pending'
-        elif status_lower in ['sevk edildi', 'shipped', 'delivered']:
-            return 'shipped'
-        else:
-            return 'pending'
+        return self.STATUS_CLASSES.get(status.lower(), 'pending')
 
 
+@functools.lru_cache(maxsize=1)
 def get_pallet_summary_generator() -> PalletSummaryGenerator:
-    """Factory function to get pallet summary generator"""
+    """Factory function to get the shared (stateless) pallet summary generator"""
     return PalletSummaryGenerator()
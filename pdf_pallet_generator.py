@@ -17,15 +17,19 @@ Author: Copilot
 Version: 1.0.0 (PDF-Based)
 """
 
+import io
 import os
+import copy
+import re
 import time
+import functools
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from reportlab.lib.pagesizes import A5
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm, cm
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.platypus.frames import Frame
 from reportlab.platypus.doctemplate import PageTemplate, BaseDocTemplate
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
@@ -34,115 +38,262 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfgen import canvas
 
 
+# ASCII replacements for Turkish letters, applied when text does not fit latin-1
+_TURKISH_FOLD = str.maketrans({
+    'ç': 'c', 'Ç': 'C',
+    'ğ': 'g', 'Ğ': 'G',
+    'ı': 'i', 'İ': 'I',
+    'ö': 'o', 'Ö': 'O',
+    'ş': 's', 'Ş': 'S',
+    'ü': 'u', 'Ü': 'U',
+})
+
+# Matches any character that does not fit latin-1
+_NON_LATIN1 = re.compile(r'[^\x00-\xff]')
+
+
+def _encode_pdf_text(text: str) -> str:
+    """Encode Turkish characters for PDF compatibility"""
+    if not text:
+        return ""
+    if not isinstance(text, str) or text.isascii():
+        # ASCII needs no folding; non-str is the ultimate fallback, returned as-is
+        return text
+    return _fold_non_ascii(text)
+
+
+@functools.lru_cache(maxsize=4096)
+def _fold_non_ascii(text: str) -> str:
+    """Fold non-ASCII text for the PDF fonts, memoized for repeated values
+    
+    Text that fits latin-1 can be used as-is; otherwise the Turkish
+    letters are folded to ASCII in a single translate pass.
+    """
+    if not _NON_LATIN1.search(text):
+        return text
+    return text.translate(_TURKISH_FOLD)
+
+
+# Static report labels, encoded once instead of on every PDF
+_LBL_REPORT_TITLE = _encode_pdf_text("PALET ÖZET RAPORU")
+_LBL_WEIGHT_INFO = _encode_pdf_text("AĞIRLIK VE ÖZET BİLGİLERİ")
+_LBL_PRODUCT_GROUPS = _encode_pdf_text("ÜRÜN GRUPLARI ÖZETİ")
+_LBL_STOCK_DETAILS = _encode_pdf_text("DETAYLI STOK BİLGİLERİ")
+_LBL_AUTO_GENERATED = _encode_pdf_text("Bu rapor otomatik olarak oluşturulmuştur.")
+_LBL_PALLET_ID = _encode_pdf_text('Palet ID:')
+_LBL_STATUS = _encode_pdf_text('Durum:')
+_LBL_BARCODE = _encode_pdf_text('Barkod:')
+_LBL_TYPE = _encode_pdf_text('Tip:')
+_LBL_WAREHOUSE = _encode_pdf_text('Depo:')
+_LBL_DATE = _encode_pdf_text('Tarih:')
+_LBL_TOTAL_PRODUCTS = _encode_pdf_text('Toplam Ürün:')
+_LBL_TOTAL_STOCK = _encode_pdf_text('Toplam Stok:')
+_LBL_TOTAL_WEIGHT = _encode_pdf_text('Toplam Ağırlık:')
+_LBL_TOTAL_QUANTITY = _encode_pdf_text('Toplam Miktar:')
+_LBL_UTILIZATION = _encode_pdf_text('Kullanım Oranı:')
+
+# Header rows of the products and stock tables
+_PRODUCTS_HEADER = tuple(_encode_pdf_text(h) for h in ('Ürün Kodu', 'Birim', 'Toplam Miktar', 'Stok Sayısı'))
+_STOCK_HEADER = tuple(_encode_pdf_text(h) for h in ('Ürün Kodu', 'Ürün Adı', 'Miktar', 'Durum'))
+
+
+# DejaVu font locations, first existing file wins
+_FONT_PATHS = (
+    '/System/Library/Fonts/DejaVuSans.ttf',  # macOS
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux
+    'C:\\Windows\\Fonts\\DejaVuSans.ttf',  # Windows (if installed)
+    '/usr/share/fonts/dejavu/DejaVuSans.ttf',  # Alternative Linux path
+)
+
+_BOLD_FONT_PATHS = (
+    '/System/Library/Fonts/DejaVuSans-Bold.ttf',  # macOS
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',  # Linux
+    'C:\\Windows\\Fonts\\DejaVuSans-Bold.ttf',  # Windows (if installed)
+    '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf',  # Alternative Linux path
+)
+
+
+def _register_fonts() -> Tuple[str, str]:
+    """Register Unicode-compatible fonts for Turkish characters
+    
+    Returns the (regular, bold) font names to use; Helvetica is kept for
+    any style whose DejaVu font is not installed or fails to register.
+    """
+    default_font, default_bold_font = 'Helvetica', 'Helvetica-Bold'
+    try:
+        for font_path in _FONT_PATHS:
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont('DejaVu', font_path))
+                default_font = 'DejaVu'
+                break
+        
+        for font_path in _BOLD_FONT_PATHS:
+            if os.path.exists(font_path):
+                pdfmetrics.registerFont(TTFont('DejaVu-Bold', font_path))
+                default_bold_font = 'DejaVu-Bold'
+                break
+    except Exception:
+        # If font registration fails, keep using Helvetica
+        pass
+    return default_font, default_bold_font
+
+
+# Font discovery and registration run once per process
+_DEFAULT_FONT, _DEFAULT_BOLD_FONT = _register_fonts()
+
+
 class PalletPDFGenerator:
     """Generator for A5 PDF pallet summaries with Turkish font support"""
     
+    # Column widths of the basic, weight, products and stock tables
+    _BASIC_COL_WIDTHS = (25*mm, 35*mm, 20*mm, 30*mm)
+    _WEIGHT_COL_WIDTHS = (40*mm, 30*mm)
+    _PRODUCTS_COL_WIDTHS = (30*mm, 20*mm, 25*mm, 25*mm)
+    _STOCK_COL_WIDTHS = (25*mm, 50*mm, 25*mm, 25*mm)
+    
+    # Table styles are immutable once built, so every PDF shares them
+    _BASIC_TABLE_STYLE = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
+    ])
+    
+    _WEIGHT_TABLE_STYLE = TableStyle([
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('ALIGN', (1, 0), (1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ])
+    
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), _DEFAULT_BOLD_FONT),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('FONTNAME', (0, 1), (-1, -1), _DEFAULT_FONT),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+    
+    # Unicode-compatible fonts are registered once at import
+    default_font = _DEFAULT_FONT
+    default_bold_font = _DEFAULT_BOLD_FONT
+    
+    # Paragraph styles are shared by every PDF, like the table styles
+    styles = getSampleStyleSheet()
+    
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=14,
+        textColor=colors.darkblue,
+        alignment=TA_CENTER,
+        spaceAfter=12,
+        fontName=default_bold_font
+    )
+    
+    header_style = ParagraphStyle(
+        'CustomHeader',
+        parent=styles['Heading2'],
+        fontSize=12,
+        textColor=colors.black,
+        alignment=TA_CENTER,
+        spaceAfter=8,
+        fontName=default_bold_font
+    )
+    
+    info_style = ParagraphStyle(
+        'InfoStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.black,
+        alignment=TA_LEFT,
+        spaceAfter=4,
+        fontName=default_font
+    )
+    
+    # Static paragraphs are parsed once; ReportLab stores layout state on a
+    # flowable while building, so each story gets a shallow copy
+    _PARA_REPORT_TITLE = Paragraph(_LBL_REPORT_TITLE, header_style)
+    _PARA_WEIGHT_INFO = Paragraph(_LBL_WEIGHT_INFO, header_style)
+    _PARA_PRODUCT_GROUPS = Paragraph(_LBL_PRODUCT_GROUPS, header_style)
+    _PARA_STOCK_DETAILS = Paragraph(_LBL_STOCK_DETAILS, header_style)
+    _PARA_SEPARATOR = Paragraph("─" * 50, info_style)
+    _PARA_AUTO_GENERATED = Paragraph(_LBL_AUTO_GENERATED, info_style)
+    
     def __init__(self):
         self.page_width, self.page_height = A5
         self.margin = 10 * mm
+
+    def generate_pdf_summary(self, pallet_data: Dict[str, Any]) -> str:
+        """Generate PDF summary for pallet data"""
+        pallet_id, story = self._build_story(pallet_data)
         
-        # Define styles first
-        self.styles = getSampleStyleSheet()
+        # Generate filename
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        filename = f"pallet_summary_{pallet_id}_{timestamp}.pdf"
         
-        # Set default font names
-        self.default_font = 'Helvetica'
-        self.default_bold_font = 'Helvetica-Bold'
+        with open(filename, 'wb') as f:
+            f.write(self._render_pdf(story))
         
-        # Try to register Unicode-compatible fonts
-        self._register_fonts()
+        return os.path.abspath(filename)
+
+    def generate_pdf_bytes(self, pallet_data: Dict[str, Any]) -> bytes:
+        """Generate PDF summary in memory without touching the filesystem"""
+        _, story = self._build_story(pallet_data)
+        return self._render_pdf(story)
+
+    def generate_pdf_batch(self, pallets: List[Dict[str, Any]]) -> str:
+        """Generate one multi-page PDF with a summary per pallet
         
-        # Custom styles with proper font names
-        self.title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=self.styles['Heading1'],
-            fontSize=14,
-            textColor=colors.darkblue,
-            alignment=TA_CENTER,
-            spaceAfter=12,
-            fontName=self.default_bold_font
-        )
+        Each pallet starts on a new page; the document is laid out and
+        written once for the whole batch.
+        """
+        if not pallets:
+            raise ValueError("No pallets given for the PDF batch")
         
-        self.header_style = ParagraphStyle(
-            'CustomHeader',
-            parent=self.styles['Heading2'],
-            fontSize=12,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=8,
-            fontName=self.default_bold_font
-        )
+        story = []
+        for pallet_data in pallets:
+            if story:
+                story.append(PageBreak())
+            story += self._build_story(pallet_data)[1]
         
-        self.info_style = ParagraphStyle(
-            'InfoStyle',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            textColor=colors.black,
-            alignment=TA_LEFT,
-            spaceAfter=4,
-            fontName=self.default_font
-        )
+        # Generate filename
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        filename = f"pallet_summary_batch_{len(pallets)}_{timestamp}.pdf"
+        
+        with open(filename, 'wb') as f:
+            f.write(self._render_pdf(story))
         
-        self.table_style = TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), self.default_bold_font),
-            ('FONTSIZE', (0, 0), (-1, 0), 9),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('FONTNAME', (0, 1), (-1, -1), self.default_font),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ])
+        return os.path.abspath(filename)
 
-    def _register_fonts(self):
-        """Register Unicode-compatible fonts for Turkish characters"""
-        try:
-            # Try to register DejaVu fonts (commonly available)
-            from reportlab.pdfbase import pdfmetrics
-            from reportlab.pdfbase.ttfonts import TTFont
-            
-            # Try to find DejaVu fonts on system
-            import os
-            font_paths = [
-                '/System/Library/Fonts/DejaVuSans.ttf',  # macOS
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux
-                'C:\\Windows\\Fonts\\DejaVuSans.ttf',  # Windows (if installed)
-                '/usr/share/fonts/dejavu/DejaVuSans.ttf',  # Alternative Linux path
-            ]
-            
-            bold_font_paths = [
-                '/System/Library/Fonts/DejaVuSans-Bold.ttf',  # macOS
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf',  # Linux
-                'C:\\Windows\\Fonts\\DejaVuSans-Bold.ttf',  # Windows (if installed)
-                '/usr/share/fonts/dejavu/DejaVuSans-Bold.ttf',  # Alternative Linux path
-            ]
-            
-            # Register regular DejaVu font
-            for font_path in font_paths:
-                if os.path.exists(font_path):
-                    pdfmetrics.registerFont(TTFont('DejaVu', font_path))
-                    self.default_font = 'DejaVu'
-                    break
-            
-            # Register bold DejaVu font
-            for font_path in bold_font_paths:
-                if os.path.exists(font_path):
-                    pdfmetrics.registerFont(TTFont('DejaVu-Bold', font_path))
-                    self.default_bold_font = 'DejaVu-Bold'
-                    break
-                    
-        except Exception as e:
-            # If font registration fails, keep using Helvetica
-            pass
-    
-    def _setup_helvetica_fallback(self):
-        """Setup Helvetica fonts with better Turkish character support"""
-        # This method is no longer needed as we set defaults
-        pass
+    def _render_pdf(self, story: List) -> bytes:
+        """Lay out the story on A5 pages and return the PDF bytes"""
+        buf = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buf,
+            pagesize=A5,
+            rightMargin=self.margin,
+            leftMargin=self.margin,
+            topMargin=self.margin,
+            bottomMargin=self.margin
+        )
+        doc.build(story)
+        return buf.getvalue()
 
-    def generate_pdf_summary(self, pallet_data: Dict[str, Any]) -> str:
-        """Generate PDF summary for pallet data"""
+    def _build_story(self, pallet_data: Dict[str, Any]) -> Tuple[str, List]:
+        """Build the flowables of a pallet summary, returns (pallet_id, story)"""
         
         # Extract data with fallbacks - updated for new backend format
         # Check if we have the new nested structure
@@ -186,131 +337,78 @@ class PalletPDFGenerator:
         total_quantity = summary.get('totalQuantity', 0)
         utilization_percentage = summary.get('utilizationPercentage', 0)
         
-        # Generate filename
-        timestamp = time.strftime('%Y%m%d_%H%M%S')
-        filename = f"pallet_summary_{pallet_id}_{timestamp}.pdf"
-        
-        # Create PDF
-        doc = SimpleDocTemplate(
-            filename,
-            pagesize=A5,
-            rightMargin=self.margin,
-            leftMargin=self.margin,
-            topMargin=self.margin,
-            bottomMargin=self.margin
-        )
-        
         # Build content with proper Turkish character encoding
         story = []
         
         # Company header
         story.append(Paragraph(self._encode_text(company_name), self.title_style))
-        story.append(Paragraph(self._encode_text("PALET ÖZET RAPORU"), self.header_style))
+        story.append(copy.copy(self._PARA_REPORT_TITLE))
         story.append(Spacer(1, 8))
         
         # Basic information table with encoded text
         basic_info = [
-            [self._encode_text('Palet ID:'), str(pallet_id), self._encode_text('Durum:'), self._encode_text(status)],
-            [self._encode_text('Barkod:'), str(barcode), self._encode_text('Tip:'), self._encode_text(pallet_type)],
-            [self._encode_text('Depo:'), self._encode_text(warehouse), self._encode_text('Tarih:'), str(order_date)],
-            [self._encode_text('Toplam Ürün:'), str(total_product_types), self._encode_text('Toplam Stok:'), str(total_stock_items)],
+            [_LBL_PALLET_ID, str(pallet_id), _LBL_STATUS, self._encode_text(status)],
+            [_LBL_BARCODE, str(barcode), _LBL_TYPE, self._encode_text(pallet_type)],
+            [_LBL_WAREHOUSE, self._encode_text(warehouse), _LBL_DATE, str(order_date)],
+            [_LBL_TOTAL_PRODUCTS, str(total_product_types), _LBL_TOTAL_STOCK, str(total_stock_items)],
         ]
         
-        basic_table = Table(basic_info, colWidths=[25*mm, 35*mm, 20*mm, 30*mm])
-        basic_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (2, 0), (2, -1), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('BACKGROUND', (2, 0), (2, -1), colors.lightgrey),
-        ]))
+        basic_table = Table(basic_info, colWidths=self._BASIC_COL_WIDTHS, style=self._BASIC_TABLE_STYLE)
         
         story.append(basic_table)
         story.append(Spacer(1, 10))
         
         # Weight and summary information
-        story.append(Paragraph(self._encode_text("AĞIRLIK VE ÖZET BİLGİLERİ"), self.header_style))
+        story.append(copy.copy(self._PARA_WEIGHT_INFO))
         
         weight_info = [
-            [self._encode_text('Toplam Ağırlık:'), f"{total_weight:.2f} kg"],
-            [self._encode_text('Toplam Miktar:'), f"{total_quantity}"],
-            [self._encode_text('Kullanım Oranı:'), f"{utilization_percentage:.1f}%"],
+            [_LBL_TOTAL_WEIGHT, f"{total_weight:.2f} kg"],
+            [_LBL_TOTAL_QUANTITY, f"{total_quantity}"],
+            [_LBL_UTILIZATION, f"{utilization_percentage:.1f}%"],
         ]
         
-        weight_table = Table(weight_info, colWidths=[40*mm, 30*mm])
-        weight_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-            ('ALIGN', (1, 0), (1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-        ]))
+        weight_table = Table(weight_info, colWidths=self._WEIGHT_COL_WIDTHS, style=self._WEIGHT_TABLE_STYLE)
         
         story.append(weight_table)
         story.append(Spacer(1, 10))
         
         # Grouped products summary
         if grouped_products:
-            story.append(Paragraph(self._encode_text("ÜRÜN GRUPLARI ÖZETİ"), self.header_style))
+            story.append(copy.copy(self._PARA_PRODUCT_GROUPS))
             
             # Products table with encoded headers
-            products_data = [[
-                self._encode_text('Ürün Kodu'), 
-                self._encode_text('Birim'), 
-                self._encode_text('Toplam Miktar'),
-                self._encode_text('Stok Sayısı')
-            ]]
-            
-            for product in grouped_products:
-                product_code = product.get('productCode', '-')
-                unit = product.get('unit', '-')
-                total_qty = product.get('totalQuantity', 0)
-                stock_count = product.get('stockCount', 0)
-                
-                products_data.append([
-                    self._encode_text(str(product_code)), 
-                    str(unit), 
-                    str(total_qty),
-                    str(stock_count)
-                ])
+            products_data = [list(_PRODUCTS_HEADER)]
+            products_data += [
+                [
+                    _encode_pdf_text(str(product.get('productCode', '-'))),
+                    str(product.get('unit', '-')),
+                    str(product.get('totalQuantity', 0)),
+                    str(product.get('stockCount', 0)),
+                ]
+                for product in grouped_products
+            ]
             
-            products_table = Table(products_data, colWidths=[30*mm, 20*mm, 25*mm, 25*mm])
-            products_table.setStyle(self.table_style)
+            products_table = Table(products_data, colWidths=self._PRODUCTS_COL_WIDTHS, style=self.table_style)
             story.append(products_table)
             story.append(Spacer(1, 10))
         
         # Detailed stock information (limited to first 5 items to save space)
         if stock_details:
-            story.append(Paragraph(self._encode_text("DETAYLI STOK BİLGİLERİ"), self.header_style))
+            story.append(copy.copy(self._PARA_STOCK_DETAILS))
             
             # Stock details table with encoded headers
-            stock_data = [[
-                self._encode_text('Ürün Kodu'), 
-                self._encode_text('Ürün Adı'), 
-                self._encode_text('Miktar'),
-                self._encode_text('Durum')
-            ]]
+            stock_data = [list(_STOCK_HEADER)]
             
             # Show only first 5 items to keep PDF readable
-            for stock in stock_details[:5]:
-                stockCard = stock.get('stockCard', {})
-                product_code = stock.get('productCode', '-')
-                product_name = stockCard.get('productName', '-')
-                quantity = stock.get('quantity', 0)
-                unit = stock.get('unit', '')
-                stock_status = stock.get('status', '-')
-                
-                stock_data.append([
-                    self._encode_text(str(product_code)), 
-                    str(product_name), 
-                    f"{quantity} {unit}",
-                    self._encode_text(str(stock_status))
-                ])
+            stock_data += [
+                [
+                    _encode_pdf_text(str(stock.get('productCode', '-'))),
+                    str(stock.get('stockCard', {}).get('productName', '-')),
+                    f"{stock.get('quantity', 0)} {stock.get('unit', '')}",
+                    _encode_pdf_text(str(stock.get('status', '-'))),
+                ]
+                for stock in stock_details[:5]
+            ]
             
             # Add note if there are more items
             if len(stock_details) > 5:
@@ -319,71 +417,29 @@ class PalletPDFGenerator:
                     '', '', ''
                 ])
             
-            stock_table = Table(stock_data, colWidths=[25*mm, 50*mm, 25*mm, 25*mm])
-            stock_table.setStyle(self.table_style)
+            stock_table = Table(stock_data, colWidths=self._STOCK_COL_WIDTHS, style=self.table_style)
             story.append(stock_table)
         
         # Additional info with encoded text
         story.append(Spacer(1, 15))
-        story.append(Paragraph("─" * 50, self.info_style))
+        story.append(copy.copy(self._PARA_SEPARATOR))
         story.append(Paragraph(
             self._encode_text(f"Rapor Tarihi: {datetime.now().strftime('%d.%m.%Y %H:%M')}"), 
             self.info_style
         ))
-        story.append(Paragraph(
-            self._encode_text("Bu rapor otomatik olarak oluşturulmuştur."), 
-            self.info_style
-        ))
-        
-        # Build PDF
-        doc.build(story)
+        story.append(copy.copy(self._PARA_AUTO_GENERATED))
         
-        return os.path.abspath(filename)
+        return pallet_id, story
 
     def _encode_text(self, text: str) -> str:
         """Encode Turkish characters for PDF compatibility"""
-        if not text:
-            return ""
-        
-        # Use ReportLab's built-in encoding support
-        try:
-            # For ReportLab, we can use unicode directly if we escape special characters
-            # and rely on font handling
-            
-            # Simple character replacement for better compatibility
-            replacements = {
-                'ç': 'c',
-                'Ç': 'C', 
-                'ğ': 'g',
-                'Ğ': 'G',
-                'ı': 'i',
-                'İ': 'I',
-                'ö': 'o',
-                'Ö': 'O',
-                'ş': 's',
-                'Ş': 'S',
-                'ü': 'u',
-                'Ü': 'U'
-            }
-            
-            # Use unicode with fallback to ASCII replacements
-            encoded = text
-            
-            # If we have unicode support, try to preserve original
-            try:
-                encoded.encode('latin-1')
-                return encoded  # Can be encoded in latin-1, should work
-            except UnicodeEncodeError:
-                # Fall back to character replacement
-                for turkish, replacement in replacements.items():
-                    encoded = encoded.replace(turkish, replacement)
-                return encoded
-                
-        except Exception:
-            # Ultimate fallback - just return as-is
-            return text
+        return _encode_pdf_text(text)
 
 
+@functools.lru_cache(maxsize=1)
 def get_pdf_pallet_generator() -> PalletPDFGenerator:
-    """Factory function to get PDF pallet generator"""
+    """Factory function to get the shared PDF pallet generator
+    
+    Fonts and styles are set up once; generate_pdf_summary keeps no per-call state.
+    """
     return PalletPDFGenerator()
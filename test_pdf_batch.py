@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test PDF Batch and In-Memory Generation
+=======================================
+
+Bu script generate_pdf_batch ve generate_pdf_bytes fonksiyonlarını test eder.
+"""
+
+import os
+import re
+
+# Sayfa nesneleri (/Type /Pages sayfa ağacıdır, sayılmaz)
+PAGE_OBJECT = re.compile(rb'/Type\s*/Page(?!s)')
+
+PALLETS = [
+    {
+        'palet_id': 'PLT2025101',
+        'firma_adi': 'Bil Plastik Ambalaj Şirketi',
+        'depo_adi': 'İstanbul Merkez Deposu',
+        'durum': 'HAZIR',
+        'brut_kg': '32.5',
+    },
+    {
+        'palet_id': 'PLT2025102',
+        'firma_adi': 'Bil Plastik Ambalaj',
+        'depo_adi': 'Ana Fabrika',
+        'durum': 'BEKLEMEDE',
+        'brut_kg': '28.0',
+    },
+]
+
+def test_pdf_bytes():
+    """generate_pdf_bytes bellekte geçerli bir PDF döndürmeli"""
+    print("📄 PDF Bytes Testi")
+    print("=" * 60)
+    
+    from pdf_pallet_generator import get_pdf_pallet_generator
+    pdf_generator = get_pdf_pallet_generator()
+    
+    data = pdf_generator.generate_pdf_bytes(PALLETS[0])
+    print(f"📊 PDF boyutu: {len(data):,} bytes")
+    
+    assert isinstance(data, bytes)
+    assert data.startswith(b'%PDF')
+    assert len(PAGE_OBJECT.findall(data)) == 1
+    print("✅ PDF bytes testi başarılı")
+
+def test_pdf_batch():
+    """İki paletlik batch tek bir PDF, palet başına bir sayfa üretmeli"""
+    print("📄 PDF Batch Testi")
+    print("=" * 60)
+    
+    from pdf_pallet_generator import get_pdf_pallet_generator
+    pdf_generator = get_pdf_pallet_generator()
+    
+    pdf_file = pdf_generator.generate_pdf_batch(PALLETS)
+    try:
+        print(f"✅ PDF oluşturuldu: {pdf_file}")
+        
+        with open(pdf_file, 'rb') as f:
+            data = f.read()
+        
+        pages = len(PAGE_OBJECT.findall(data))
+        print(f"📊 Sayfa sayısı: {pages}")
+        
+        assert data.startswith(b'%PDF')
+        assert data.count(b'%%EOF') == 1
+        assert pages == len(PALLETS)
+        print("✅ PDF batch testi başarılı")
+    finally:
+        os.remove(pdf_file)
+
+if __name__ == "__main__":
+    test_pdf_bytes()
+    print()
+    test_pdf_batch()